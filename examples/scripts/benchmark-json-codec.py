@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from builtins import range
+from future import standard_library
+standard_library.install_aliases()
+import sys
+
+PYTHON_VERSION = sys.version_info[:3]
+PY2 = (PYTHON_VERSION[0] == 2)
+if PY2:
+    if PYTHON_VERSION < (2, 7, 9):
+        raise Exception('Must use Python 2.7.9 or later')
+elif PYTHON_VERSION < (3, 4):
+    raise Exception('Must use Python 3.4 or later')
+
+import hpOneView as hpov
+import hpOneView.codec as codec
+import json
+import timeit
+
+
+def server_profiles(count):
+    members = []
+    for i in range(count):
+        members.append({
+            'type': 'ServerProfileV5',
+            'uri': '/rest/server-profiles/%08d-0000-4000-8000-000000000000' % i,
+            'name': 'profile-%d' % i,
+            'description': 'ESXi host %d' % i,
+            'serialNumber': 'VCGE%06d' % i,
+            'uuid': '%08d-0000-4000-8000-000000000000' % i,
+            'serverHardwareUri': '/rest/server-hardware/%d' % i,
+            'serverHardwareTypeUri': '/rest/server-hardware-types/1',
+            'enclosureGroupUri': '/rest/enclosure-groups/1',
+            'enclosureBay': i % 16 + 1,
+            'affinity': 'Bay',
+            'state': 'Normal',
+            'status': 'OK',
+            'firmware': {'manageFirmware': True, 'forceInstallFirmware': False,
+                         'firmwareBaselineUri': '/rest/firmware-drivers/spp'},
+            'connections': [{'id': n, 'functionType': 'Ethernet',
+                             'networkUri': '/rest/ethernet-networks/%d' % n,
+                             'portId': 'Flb 1:%d-a' % (n % 2 + 1),
+                             'requestedMbps': '2500', 'allocatedMbps': 2500,
+                             'mac': 'A2:6E:%02X:00:00:%02X' % (i % 256, n),
+                             'boot': {'priority': 'NotBootable'}}
+                            for n in range(1, 9)],
+            'bios': {'manageBios': True, 'overriddenSettings': [
+                {'id': '%d' % n, 'value': '%d' % (n * 3)}
+                for n in range(20)]},
+            'boot': {'manageBoot': True,
+                     'order': ['CD', 'Floppy', 'USB', 'HardDisk', 'PXE']},
+            'created': '2016-03-01T12:00:00.000Z',
+            'modified': '2016-03-02T12:00:00.000Z',
+            'eTag': '1456920000000/%d' % i})
+    return {'type': 'ServerProfileListV5', 'start': 0, 'count': count,
+            'total': count, 'members': members}
+
+
+def alerts(count):
+    members = []
+    for i in range(count):
+        members.append({
+            'type': 'AlertResourceV3',
+            'uri': '/rest/alerts/%d' % i,
+            'alertState': 'Active' if i % 3 else 'Cleared',
+            'severity': ['OK', 'Warning', 'Critical'][i % 3],
+            'healthCategory': 'Power',
+            'description': 'The power supply in bay %d has failed or is '
+                           'not receiving power. \u00c9tat: d\u00e9faut' % i,
+            'correctiveAction': 'Check the power cord and the power '
+                                'distribution unit.',
+            'associatedResource': {
+                'resourceName': 'Encl%d' % (i % 40),
+                'resourceUri': '/rest/enclosures/%d' % (i % 40),
+                'resourceCategory': 'enclosures',
+                'associationType': 'HAS_A'},
+            'changeLog': [{'userEntered': False, 'notes': 'Cleared',
+                           'created': '2016-03-01T12:00:00.000Z'}],
+            'urgency': 'High',
+            'created': '2016-03-01T12:00:00.000Z',
+            'modified': '2016-03-01T12:00:00.000Z',
+            'eTag': '%d' % i})
+    return {'type': 'AlertResourceCollectionV3', 'start': 0, 'count': count,
+            'total': count, 'members': members}
+
+
+def legacy_loads(data):
+    # What connection.do_http did before the codec layer
+    return json.loads(data.decode('utf-8'))
+
+
+def legacy_dumps(obj):
+    return json.dumps(obj)
+
+
+def bench(label, doc, repeat):
+    data = json.dumps(doc).encode('utf-8')
+    print('%s: %d members, %.1f MB' % (label, len(doc['members']),
+                                       len(data) / 1048576.0))
+    rows = [('legacy', legacy_loads, legacy_dumps)]
+    for name in codec.available_codecs():
+        c = codec.make_codec(name)
+        rows.append((name, c.loads, c.dumps))
+    base = None
+    for name, loads, dumps in rows:
+        decode = min(timeit.repeat(lambda: loads(data), number=1,
+                                   repeat=repeat))
+        encode = min(timeit.repeat(lambda: dumps(doc), number=1,
+                                   repeat=repeat))
+        if base is None:
+            base = decode + encode
+        print('    %-10s decode %8.2f ms  encode %8.2f ms  x%.1f' %
+              (name, decode * 1000, encode * 1000, base / (decode + encode)))
+
+
+def main():
+    parser = argparse.ArgumentParser(add_help=True,
+                                     formatter_class=argparse.RawTextHelpFormatter,
+                                     description='''
+    Compare the JSON codecs installed on this system on payloads shaped like
+    /rest/server-profiles and /rest/alerts collections, or on a saved
+    response body
+
+    Usage: ''')
+    parser.add_argument('-n', dest='count', required=False, type=int,
+                        default=2000,
+                        help='''
+    Number of members in each generated collection''')
+    parser.add_argument('-r', dest='repeat', required=False, type=int,
+                        default=5,
+                        help='''
+    Number of timed runs, the best one is reported''')
+    parser.add_argument('-f', dest='file', required=False,
+                        help='''
+    JSON collection saved from the appliance to benchmark instead''')
+
+    args = parser.parse_args()
+
+    print('Default codec: %s' % hpov.get_codec().name)
+    if args.file:
+        with open(args.file, 'rb') as fin:
+            bench(args.file, json.loads(fin.read().decode('utf-8')),
+                  args.repeat)
+        return
+    bench('/rest/server-profiles', server_profiles(args.count), args.repeat)
+    bench('/rest/alerts', alerts(args.count * 5), args.repeat)
+
+
+if __name__ == '__main__':
+    import sys
+    import argparse
+    sys.exit(main())
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
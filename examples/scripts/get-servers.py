@@ -61,8 +61,8 @@ def login(con, credential):
         print('Login failed')
 
 
-def getservers(srv):
-    ret = srv.get_servers()
+def getservers(srv, fields=None):
+    ret = srv.get_servers(fields)
     pprint(ret)
 
 
@@ -93,6 +93,9 @@ def main():
                         default='Local',
                         help='''
     HP OneView Authorized Login Domain''')
+    parser.add_argument('-f', dest='fields', required=False,
+                        help='''
+    Comma separated server attributes to display, e.g. name,uri,status''')
 
     args = parser.parse_args()
     credential = {'authLoginDomain': args.domain.upper(), 'userName': args.user, 'password': args.passwd}
@@ -108,7 +111,7 @@ def main():
     login(con, credential)
     acceptEULA(con)
 
-    getservers(srv)
+    getservers(srv, args.fields.split(',') if args.fields else None)
 
 if __name__ == '__main__':
     import sys
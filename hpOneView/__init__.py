@@ -52,6 +52,15 @@ elif PYTHON_VERSION < (3, 4):
     raise Exception('Must use Python 3.4 or later')
 
 from hpOneView.common import *
+from hpOneView.codec import *
+from hpOneView.retry import *
+from hpOneView.governor import *
+from hpOneView.deadline import *
+from hpOneView.breaker import *
+from hpOneView.session import *
+from hpOneView.transfer import *
+from hpOneView.cursor import *
+from hpOneView.query import *
 from hpOneView.connection import *
 from hpOneView.servers import *
 from hpOneView.activity import *
@@ -64,6 +73,8 @@ from hpOneView.storage import *
 from hpOneView.fcsans import *
 from hpOneView.facilities import *
 from hpOneView.uncategorized import *
+if PYTHON_VERSION >= (3, 5):
+    from hpOneView.aio import *
 
 
 def main():
@@ -10,8 +10,6 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import division
 from __future__ import absolute_import
-from builtins import open
-from builtins import filter
 from builtins import str
 from future import standard_library
 standard_library.install_aliases()
@@ -48,7 +46,12 @@ __status__ = 'Development'
 
 from hpOneView.common import *
 from hpOneView.connection import *
+from hpOneView.deadline import *
 from hpOneView.exceptions import *
+from hpOneView.query import Query
+from hpOneView.query import eq
+from hpOneView.query import in_
+from hpOneView.query import project
 import time  # For sleep
 import sys  # For verbose
 
@@ -56,6 +59,71 @@ import sys  # For verbose
 TaskErrorStates = ['Error', 'Warning', 'Terminated', 'Killed']
 TaskCompletedStates = ['Error', 'Warning', 'Completed', 'Terminated', 'Killed']
 TaskPendingStates = ['New', 'Starting', 'Pending', 'Running', 'Suspended', 'Stopping']
+# Task attributes read when polling many tasks at once
+TaskPollFields = ['uri', 'taskState', 'percentComplete']
+
+
+class TaskPollScheduler(object):
+    """ Chooses how long to wait before polling a running task again.
+
+    The time left is estimated, in order of preference, from the progress
+    rate seen between polls, from the task expectedDuration scaled by its
+    percentage complete, and from expectedDuration less the time waited
+    so far. The task is polled again after half of that estimate, so
+    polls get closer together as it nears the end. Without any estimate
+    the interval doubles after every poll, except while new
+    progressUpdates keep arriving. Intervals stay within [minInterval,
+    maxInterval] seconds.
+    """
+
+    def __init__(self, minInterval=1, maxInterval=30):
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self._started = time.time()
+        self._backoff = minInterval
+        self._last = None
+        self._updates = 0
+
+    @staticmethod
+    def percent_complete(task):
+        percent = task.get('computedPercentComplete')
+        if percent is None:
+            percent = task.get('percentComplete')
+        return percent
+
+    def estimate_remaining(self, task, now=None):
+        """ Seconds the task should still run for, or None if unknown."""
+        now = time.time() if now is None else now
+        percent = self.percent_complete(task)
+        expected = task.get('expectedDuration')
+        if percent is not None and percent >= 100:
+            return 0
+        if percent and self._last is not None:
+            lastTime, lastPercent = self._last
+            if lastPercent is not None and percent > lastPercent and \
+                    now > lastTime:
+                return (100 - percent) * (now - lastTime) / \
+                    (percent - lastPercent)
+        if expected and percent:
+            return expected * (100 - percent) / 100
+        if expected and expected > now - self._started:
+            return expected - (now - self._started)
+        return None
+
+    def next_interval(self, task, now=None):
+        """ Seconds to wait before polling ``task`` again."""
+        now = time.time() if now is None else now
+        remaining = self.estimate_remaining(task, now)
+        self._last = (now, self.percent_complete(task))
+        updates = len(task.get('progressUpdates') or ())
+        if remaining is not None:
+            interval = remaining / 2
+        else:
+            interval = self._backoff
+            if updates <= self._updates:
+                self._backoff = min(self._backoff * 2, self.maxInterval)
+        self._updates = updates
+        return max(self.minInterval, min(self.maxInterval, interval))
 
 
 class activity(object):
@@ -123,21 +191,33 @@ class activity(object):
                 return True
         return False
 
-    def wait4task(self, task, tout=60, verbose=False):
-        count = 0
+    def wait4task(self, task, tout=60, verbose=False, minInterval=1,
+                  maxInterval=30):
+        """ Wait for ``task`` to leave the TaskPendingStates and return it.
+
+        The polling interval adapts to the progress the task reports (see
+        TaskPollScheduler), between minInterval and maxInterval seconds.
+        HPOneViewTimeout is raised once the task is still running after
+        ``tout`` seconds of wall clock time.
+        """
         if task is None:
             return None
-        while self.is_task_running(task):
+        scheduler = TaskPollScheduler(minInterval, maxInterval)
+        started = time.time()
+        task = self._con.get(task['uri'])
+        while task.get('taskState') in TaskPendingStates:
+            waited = time.time() - started
+            if waited >= tout:
+                raise HPOneViewTimeout('Waited ' + str(tout) +
+                                       ' seconds for task to complete, aborting')
             if verbose:
                     sys.stdout.write('Task still running after %d seconds   \r'
-                                     % count)
+                                     % waited)
                     sys.stdout.flush()
-            time.sleep(1)
-            count += 1
-            if count > tout:
-                raise HPOneViewTimeout('Waited ' + str(tout) +
-                                       ' seconds for task to complete, aborting')
-        task = self._con.get(task['uri'])
+            delay = min(scheduler.next_interval(task), tout - waited)
+            time.sleep(remaining_time(delay))
+            check_deadline('Waiting for task ' + task['uri'])
+            task = self._con.get(task['uri'])
         if task['taskState'] in TaskErrorStates and task['taskState'] != 'Warning':
                 err = task['taskErrors'][0]
                 msg = err['message']
@@ -149,37 +229,96 @@ class activity(object):
                     raise HPOneViewTaskError('Unknown Exception')
         return task
 
-    def wait4tasks(self, tasks, tout=60, verbose=False):
-        running = list(filter(self.is_task_running, tasks[:]))
+    def get_task_states(self, tasks, chunkSize=40):
+        """ Read the state of many tasks with one request per chunk.
+
+        Each chunk of tasks is read with a single /rest/tasks query
+        filtered on their URIs, asking only for TaskPollFields. Tasks the
+        query does not return are read one by one.
+
+        Args:
+            tasks:
+                Task resources or task URIs.
+            chunkSize:
+                Tasks per query, which bounds the length of its URI.
+
+        Returns:
+            A dict mapping each task URI to a dict of TaskPollFields.
+        """
+        uris = []
+        for task in tasks:
+            taskUri = task['uri'] if isinstance(task, dict) else task
+            if taskUri not in uris:
+                uris.append(taskUri)
+        states = {}
+        for i in range(0, len(uris), chunkSize):
+            chunk = uris[i:i + chunkSize]
+            query = Query(in_('uri', chunk)).fields(*TaskPollFields) \
+                .start(0).count(len(chunk))
+            for member in get_members(self._con.get(query.uri(uri['task']))):
+                if member.get('uri') in chunk:
+                    states[member['uri']] = project(member, TaskPollFields)
+        for taskUri in uris:
+            if taskUri not in states:
+                states[taskUri] = project(self._con.get(taskUri),
+                                          TaskPollFields)
+        return states
+
+    def wait4tasks(self, tasks, tout=60, verbose=False, chunkSize=40):
+        """ Wait for all of ``tasks`` to leave the TaskPendingStates.
+
+        Every second the tasks still running are polled together with
+        get_task_states, so the appliance serves one request per
+        ``chunkSize`` tasks rather than one per task.
+
+        Returns:
+            The last state read for each task (see get_task_states), in the
+            order of ``tasks``.
+        """
+        tasks = [task for task in tasks if 'uri' in task]
+        states = self.get_task_states(tasks, chunkSize)
+        running = [taskUri for taskUri, state in states.items()
+                   if state.get('taskState') in TaskPendingStates]
         count = 0
         while running:
             if verbose:
                     print(('Tasks still running after %s seconds', count))
                     print(running)
-            time.sleep(1)
+            time.sleep(remaining_time(1))
+            check_deadline('Waiting for tasks')
             count += 1
-            running = list(filter(self.is_task_running, running))
-            if count > tout:
-                raise HPOneViewTimeout('Waited 60 seconds for task to complete'
-                                       ', aborting')
+            states.update(self.get_task_states(running, chunkSize))
+            running = [taskUri for taskUri in running
+                       if states[taskUri].get('taskState') in
+                       TaskPendingStates]
+            if running and count > tout:
+                raise HPOneViewTimeout('Waited ' + str(tout) + ' seconds for'
+                                       ' tasks to complete, aborting')
+        return [states[task['uri']] for task in tasks]
 
     def get_tasks(self):
         return get_members(self._con.get(uri['task']))
 
+    def iter_tasks(self, page_size=None):
+        return self._con.iter_members(uri['task'], page_size)
+
     ###########################################################################
     # Alerts
     ###########################################################################
     def get_alerts(self, AlertState='All'):
+        # Read page by page, several pages at a time, rather than asking the
+        # appliance for one response holding every alert
         if AlertState == 'All':
-        # TODO remove the evil use/hack of the large count default. The OneView
-        # API documents that count=-1 should return everything but it is not
-        # universally honored, where the extremely large count number is.
-            return get_members(self._con.get(uri['alerts'] +
-                                             '?start=0&count=9999999'))
-        else:
-            return(self._con.get_entities_byfield(uri['alerts'],
-                                                  'alertState',
-                                                  AlertState, count=9999999))
+            return self._con.get_all_members(uri['alerts'])
+        return self._con.get_all_members(
+            Query(eq('alertState', AlertState)).uri(uri['alerts']))
+
+    def iter_alerts(self, AlertState='All', page_size=None):
+        """ Generate the alerts page by page instead of in one response."""
+        if AlertState == 'All':
+            return self._con.iter_members(uri['alerts'], page_size)
+        return self._con.iter_members(
+            Query(eq('alertState', AlertState)).uri(uri['alerts']), page_size)
 
     def delete_alert(self, alert):
         self._con.delete(alert['uri'])
@@ -195,18 +334,22 @@ class activity(object):
     # Audit Logs
     ###########################################################################
     def get_audit_logs(self, query=''):
+        if not is_paged_query(query):
+            return self._con.get_all_members(uri['audit-logs'] + '?' + query)
         body = self._con.get(uri['audit-logs'] + '?' + query)
         return get_members(body)
 
+    def iter_audit_logs(self, query='', page_size=None):
+        return self._con.iter_members(uri['audit-logs'] + '?' + query,
+                                      page_size)
+
     def create_audit_log(self, auditLogRecord):
         self._con.post(uri['audit-logs'], auditLogRecord)
         return
 
-    def download_audit_logs(self, filename):
-        body = self._con.get(uri['audit-logs-download'])
-        f = open(filename, 'wb')
-        f.write(body)
-        f.close()
+    def download_audit_logs(self, filename, progress=None):
+        self._con.download(uri['audit-logs-download'], filename,
+                           progress=progress)
         return
 
     ###########################################################################
@@ -216,6 +359,9 @@ class activity(object):
         body = self._con.get(uri['events'] + '?' + query)
         return get_members(body)
 
+    def iter_events(self, query='', page_size=None):
+        return self._con.iter_members(uri['events'] + '?' + query, page_size)
+
     def create_event(self, eventRecord):
         self._con.post(uri['events'], eventRecord)
         return
@@ -0,0 +1,909 @@
+# -*- coding: utf-8 -*-
+
+"""
+aio.py
+~~~~~~~~~~~~
+
+This module implements an asyncio based connection to the appliance together
+with asynchronous counterparts of the activity, servers, networking and
+storage APIs. It requires Python 3.5 or later.
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+__title__ = 'aio'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import asyncio
+import http.client
+import socket
+import sys
+import time
+
+from hpOneView import codec
+from hpOneView.common import *
+from hpOneView.connection import _ContentDecoder
+from hpOneView.connection import _TransferStats
+from hpOneView.connection import _decode_body
+from hpOneView.connection import _is_stale_connection_error
+from hpOneView.connection import _make_ssl_context
+from hpOneView.activity import TaskErrorStates
+from hpOneView.activity import TaskPendingStates
+from hpOneView.exceptions import *
+from hpOneView.query import Query
+from hpOneView.query import eq
+from hpOneView.retry import RetryPolicy
+
+
+class AsyncResponse(object):
+    """ Status line and headers of a response read by AsyncConnection."""
+
+    def __init__(self, status, reason, headers, version='HTTP/1.1'):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.version = version
+        self.will_close = False
+
+    def getheader(self, name, default=None):
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+
+class _AsyncStream(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class _AsyncConnectionPool(object):
+    """Bounded pool of keep-alive streams, the asyncio twin of the
+    connection pool used by the blocking connection class."""
+
+    def __init__(self, factory, maxsize=10, idleTimeout=60):
+        self._factory = factory
+        self._maxsize = maxsize
+        self._idleTimeout = idleTimeout
+        self._idle = []
+        self._loop = None
+        self._semaphore = None
+
+    def configure(self, maxsize=None, idleTimeout=None):
+        if maxsize is not None:
+            self._maxsize = maxsize
+            self._semaphore = None
+        if idleTimeout is not None:
+            self._idleTimeout = idleTimeout
+
+    def _bind_loop(self):
+        # Streams and semaphores belong to the event loop that created them;
+        # start afresh when the connection is used from a new loop.
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self.clear()
+            self._loop = loop
+            self._semaphore = None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._maxsize)
+        return self._semaphore
+
+    def _evict_idle(self):
+        now = time.time()
+        while self._idle and now - self._idle[0][1] > self._idleTimeout:
+            stream, released = self._idle.pop(0)
+            stream.close()
+
+    async def acquire(self):
+        """Check out a stream, returning ``(stream, reused)``."""
+        semaphore = self._bind_loop()
+        await semaphore.acquire()
+        try:
+            self._evict_idle()
+            if self._idle:
+                stream, released = self._idle.pop()
+                return stream, True
+            stream = await self._factory()
+        except BaseException:
+            semaphore.release()
+            raise
+        stream.semaphore = semaphore
+        return stream, False
+
+    def release(self, stream, reusable=True):
+        if (reusable and stream.semaphore is self._semaphore and
+                not stream.reader.at_eof()):
+            self._idle.append((stream, time.time()))
+        else:
+            stream.close()
+        stream.semaphore.release()
+
+    def clear(self):
+        while self._idle:
+            stream, released = self._idle.pop()
+            stream.close()
+
+
+async def _read_head(reader):
+    line = await reader.readline()
+    if not line:
+        raise http.client.RemoteDisconnected('Remote end closed connection '
+                                             'without response')
+    parts = line.decode('latin-1').rstrip('\r\n').split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise http.client.BadStatusLine(line)
+    try:
+        status = int(parts[1])
+    except ValueError:
+        raise http.client.BadStatusLine(line)
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, sep, value = line.decode('latin-1').partition(':')
+        headers.append((name.strip(), value.strip()))
+    return AsyncResponse(status, parts[2] if len(parts) > 2 else '', headers,
+                         parts[0])
+
+
+async def _read_chunked(reader, decoder):
+    chunks = []
+    wireBytes = 0
+    while True:
+        line = await reader.readline()
+        size = int(line.split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            # Skip any trailer headers
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            chunks.append(decoder.flush())
+            return b''.join(chunks), wireBytes
+        data = await reader.readexactly(size)
+        wireBytes += size
+        chunks.append(decoder.decompress(data))
+        await reader.readexactly(2)
+
+
+async def _read_response(reader, method, stats):
+    resp = await _read_head(reader)
+    while 100 <= resp.status < 200:
+        resp = await _read_head(reader)
+    connHeader = (resp.getheader('Connection') or '').lower()
+    resp.will_close = (connHeader == 'close' or
+                       (resp.version == 'HTTP/1.0' and
+                        connHeader != 'keep-alive'))
+    length = resp.getheader('Content-Length')
+    decoder = _ContentDecoder(resp.getheader('Content-Encoding'))
+    if method == 'HEAD' or resp.status in (204, 304):
+        data = b''
+    elif 'chunked' in (resp.getheader('Transfer-Encoding') or '').lower():
+        data, wireBytes = await _read_chunked(reader, decoder)
+    else:
+        if length is not None:
+            data = await reader.readexactly(int(length))
+        else:
+            data = await reader.read()
+            resp.will_close = True
+        wireBytes = len(data)
+        data = decoder.decompress(data) + decoder.flush()
+    if data:
+        stats.record(wireBytes, len(data), decoder.encoding)
+    return resp, data
+
+
+class AsyncConnection(object):
+    """ asyncio session with one HP OneView appliance.
+
+    Mirrors the blocking connection class, but every request method is a
+    coroutine, so thousands of requests can be in flight on a single event
+    loop. Requests share a bounded pool of keep-alive HTTPS streams; an
+    AsyncConnection is meant to be used from one event loop at a time.
+    """
+
+    def __init__(self, applianceIp):
+        self._session = None
+        self._host = applianceIp
+        self._cred = None
+        self._apiVersion = 200
+        self._headers = {
+            'X-API-Version': self._apiVersion,
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Content-Type': 'application/json'}
+        self._transferStats = _TransferStats()
+        self._proxyHost = None
+        self._proxyPort = None
+        self._doProxy = False
+        self._sslTrustedBundle = None
+        self._sslTrustAll = True
+        self._sslContext = None
+        self._validateVersion = False
+        self._pool = _AsyncConnectionPool(self._open_stream)
+        self._retryPolicy = RetryPolicy()
+        self._governor = None
+
+    async def validateVersion(self):
+        version = await self.get(uri['version'])
+        if 'minimumVersion' in version:
+            if self._apiVersion < version['minimumVersion']:
+                raise HPOneViewException('Unsupported API Version')
+        if 'currentVersion' in version:
+            if self._apiVersion > version['currentVersion']:
+                raise HPOneViewException('Unsupported API Version')
+        self._validateVersion = True
+
+    def set_proxy(self, proxyHost, proxyPort):
+        self._proxyHost = proxyHost
+        self._proxyPort = proxyPort
+        self._doProxy = True
+        self._pool.clear()
+
+    def set_trusted_ssl_bundle(self, sslBundle):
+        self._sslTrustAll = False
+        self._sslTrustedBundle = sslBundle
+        self._sslContext = None
+        self._pool.clear()
+
+    def set_retry_policy(self, policy):
+        self._retryPolicy = policy
+
+    def set_governor(self, governor):
+        self._governor = governor
+
+    def get_governor(self):
+        return self._governor
+
+    def set_connection_pool(self, maxPerHost=None, idleTimeout=None):
+        self._pool.configure(maxPerHost, idleTimeout)
+
+    def close(self):
+        """ Close all pooled streams to the appliance."""
+        self._pool.clear()
+
+    def get_session(self):
+        return self._session
+
+    def get_session_id(self):
+        return self._headers['auth']
+
+    def get_host(self):
+        return self._host
+
+    def make_url(self, path):
+        return 'https://%s%s' % (self._host, path)
+
+    def get_transfer_stats(self):
+        return self._transferStats.snapshot()
+
+    def reset_transfer_stats(self):
+        self._transferStats.reset()
+
+    def get_ssl_context(self):
+        if self._sslContext is None:
+            self._sslContext = _make_ssl_context(self._sslTrustAll,
+                                                 self._sslTrustedBundle)
+        return self._sslContext
+
+    async def _open_tunnel(self):
+        loop = asyncio.get_event_loop()
+        infos = await loop.getaddrinfo(self._proxyHost, int(self._proxyPort),
+                                       type=socket.SOCK_STREAM)
+        family, socktype, proto, canonname, address = infos[0]
+        sock = socket.socket(family, socktype, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            request = 'CONNECT %s:443 HTTP/1.1\r\nHost: %s:443\r\n\r\n' % (
+                self._host, self._host)
+            await loop.sock_sendall(sock, request.encode('latin-1'))
+            # The appliance only speaks after our TLS ClientHello, so nothing
+            # beyond the proxy's reply can arrive yet.
+            reply = b''
+            while b'\r\n\r\n' not in reply:
+                data = await loop.sock_recv(sock, 4096)
+                if not data:
+                    raise http.client.RemoteDisconnected('Proxy closed the '
+                                                         'tunnel')
+                reply += data
+            statusLine = reply.split(b'\r\n', 1)[0].decode('latin-1')
+            parts = statusLine.split(None, 2)
+            if len(parts) < 2 or parts[1] != '200':
+                raise HPOneViewException('Proxy tunnel failed: ' + statusLine)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    async def _open_stream(self):
+        context = self.get_ssl_context()
+        if self._doProxy is False:
+            reader, writer = await asyncio.open_connection(self._host, 443,
+                                                           ssl=context)
+        else:
+            sock = await self._open_tunnel()
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=context, server_hostname=self._host)
+        return _AsyncStream(reader, writer)
+
+    def _request_headers(self, headers=None):
+        reqHeaders = dict(self._headers)
+        if headers:
+            reqHeaders.update(headers)
+        return reqHeaders
+
+    def _encode_request(self, method, path, body, headers):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        lines = ['%s %s HTTP/1.1' % (method, path), 'Host: %s' % self._host]
+        names = set(name.lower() for name in headers)
+        if 'accept-encoding' not in names:
+            lines.append('Accept-Encoding: identity')
+        for name, value in headers.items():
+            lines.append('%s: %s' % (name, value))
+        if body is not None:
+            lines.append('Content-Length: %d' % len(body))
+        elif method in ('POST', 'PUT', 'PATCH'):
+            lines.append('Content-Length: 0')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head + body if body else head
+
+    async def _send_once(self, method, request):
+        # Returns (resp, data, error, sent), like connection._send_once
+        while True:
+            try:
+                stream, reused = await self._pool.acquire()
+            except Exception as e:
+                return None, None, e, False
+            try:
+                stream.writer.write(request)
+                await stream.writer.drain()
+                resp, data = await _read_response(stream.reader, method,
+                                                  self._transferStats)
+            except BaseException as e:
+                self._pool.release(stream, reusable=False)
+                if reused and (_is_stale_connection_error(e) or
+                               isinstance(e, asyncio.IncompleteReadError)):
+                    continue
+                if not isinstance(e, Exception):
+                    raise
+                return None, None, e, True
+            self._pool.release(stream, reusable=not resp.will_close)
+            return resp, data, None, True
+
+    async def _governor_enter(self, governor, method):
+        # The governor's blocking acquire would stall the event loop, so
+        # sleep out the rate limit and poll for a free in-flight slot.
+        start = time.time()
+        wait = governor.reserve(method)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        while not governor.try_enter(method, time.time() - start):
+            await asyncio.sleep(0.01)
+
+    async def do_http(self, method, path, body, headers=None):
+        request = self._encode_request(method, path, body,
+                                       self._request_headers(headers))
+        policy = self._retryPolicy
+        attempt = 0
+        while True:
+            attempt += 1
+            governor = self._governor
+            if governor is not None:
+                await self._governor_enter(governor, method)
+            try:
+                resp, data, error, sent = await self._send_once(method,
+                                                                request)
+            finally:
+                if governor is not None:
+                    governor.release(method)
+            if error is not None:
+                if not (policy.can_retry(attempt) and
+                        policy.retry_on_error(method, error, sent)):
+                    raise error
+                await asyncio.sleep(policy.delay(attempt))
+                continue
+            if (policy.can_retry(attempt) and
+                    policy.retry_on_status(method, resp.status)):
+                await asyncio.sleep(policy.delay(attempt, resp))
+                continue
+            return resp, _decode_body(data, body)
+
+    ###########################################################################
+    # Utility functions for making requests - the HTTP verbs
+    ###########################################################################
+    async def _task_or_body(self, resp, body):
+        if resp.status == 202:
+            task = await self.get(resp.getheader('Location'))
+            return task, body
+        return None, body
+
+    async def get(self, uri, headers=None):
+        resp, body = await self.do_http('GET', uri, '', headers)
+        if resp.status >= 400:
+            raise HPOneViewException(body)
+        if resp.status == 302:
+            body = await self.get(resp.getheader('Location'), headers)
+        return body
+
+    async def get_by_uri(self, xuri):
+        return await self.get(xuri)
+
+    async def put(self, uri, body, headers=None):
+        resp, body = await self.do_http('PUT', uri, codec.dumps(body), headers)
+        if resp.status >= 400:
+            raise HPOneViewException(body)
+        return await self._task_or_body(resp, body)
+
+    async def post(self, uri, body, headers=None):
+        resp, body = await self.do_http('POST', uri, codec.dumps(body), headers)
+        if resp.status >= 400:
+            raise HPOneViewException('response: %s\n%s' % (resp.status, body))
+        return await self._task_or_body(resp, body)
+
+    async def patch(self, uri, body, headers=None):
+        resp, body = await self.do_http('PATCH', uri, codec.dumps(body),
+                                        headers)
+        if resp.status >= 400:
+            raise HPOneViewException(body)
+        return await self._task_or_body(resp, body)
+
+    async def delete(self, uri, headers=None):
+        resp, body = await self.do_http('DELETE', uri, '', headers)
+        if resp.status >= 400 and resp.status != 404:
+            raise HPOneViewException(body)
+        return await self._task_or_body(resp, body)
+
+    async def get_entities_byfield(self, uri, field, value, count=-1):
+        new_uri = Query(eq(field, value)).start(0).count(count).uri(uri)
+        return get_members(await self.get(new_uri))
+
+    async def get_entity_byfield(self, uri, field, value, count=-1):
+        new_uri = Query(eq(field, value)).start(0).count(count).uri(uri)
+        return get_member(await self.get(new_uri))
+
+    async def conditional_post(self, uri, body):
+        try:
+            task, entity = await self.post(uri, body)
+        except HPOneViewException as e:
+            # Same duplicate-name handling as connection.conditional_post
+            errorCode = getattr(e, 'errorCode', None) or ''
+            if 'DUPLICATE' in errorCode and 'NAME' in errorCode:
+                entity = await self.get_entity_byfield(uri, 'name',
+                                                       body['name'])
+                if not entity:
+                    raise e
+            else:
+                raise e
+        return entity
+
+    ###########################################################################
+    # Login/Logout to/from appliance
+    ###########################################################################
+    async def login(self, cred, verbose=False):
+        if self._validateVersion is False:
+            await self.validateVersion()
+        self._cred = cred
+        task, body = await self.post(uri['loginSessions'], self._cred)
+        auth = body['sessionID']
+        self._headers = dict(self._headers, auth=auth)
+        self._session = True
+        if verbose is True:
+            print(('Session Key: ' + auth))
+
+    async def logout(self, verbose=False):
+        await self.delete(uri['loginSessions'])
+        if verbose is True:
+            print('Logged Out')
+        headers = dict(self._headers)
+        headers.pop('auth', None)
+        self._headers = headers
+        self._session = False
+
+
+class AsyncActivity(object):
+    """ asyncio counterpart of the activity class."""
+
+    def __init__(self, con):
+        self._con = con
+
+    ###########################################################################
+    # Tasks
+    ###########################################################################
+    async def get_task_associated_resource(self, task):
+        if not task:
+            return {}
+        if task['type'] == 'TaskResource':
+            obj = await self._con.get(task['associatedResourceUri'])
+            tmp = {
+                'resourceName': obj['name'],
+                'associationType': None,
+                'resourceCategory': None,
+                'resourceUri': obj['uri']}
+        elif task['type'] == 'TaskResourceV2':
+            tmp = task['associatedResource']
+        else:
+            raise HPOneViewInvalidResource('Task resource is not a recognized'
+                                           ' version')
+        return tmp
+
+    async def make_task_entity_tuple(self, obj):
+        task = {}
+        entity = {}
+        if obj:
+            if obj['category'] == 'tasks' or obj['category'] == 'backups':
+                uri = ''
+                if obj['type'] == 'TaskResource':
+                    task = obj
+                    uri = obj['associatedResourceUri']
+                elif obj['type'] == 'TaskResourceV2':
+                    task = obj
+                    uri = obj['associatedResource']['resourceUri']
+                elif obj['type'] == 'BACKUP':
+                    task = await self._con.get(obj['taskUri'])
+                    uri = obj['uri']
+                else:
+                    raise HPOneViewInvalidResource('Task resource is not a'
+                                                   ' recognized version')
+                if uri:
+                    entity = await self._con.get(uri)
+                else:
+                    entity = obj
+            else:
+                raise HPOneViewUnknownType('Unknown object type')
+        return task, entity
+
+    async def is_task_running(self, task):
+        if 'uri' in task:
+            task = await self._con.get(task['uri'])
+            if 'taskState' in task and task['taskState'] in TaskPendingStates:
+                return True
+        return False
+
+    async def wait4task(self, task, tout=60, verbose=False):
+        if task is None:
+            return None
+        count = 0
+        while await self.is_task_running(task):
+            if verbose:
+                sys.stdout.write('Task still running after %d seconds   \r'
+                                 % count)
+                sys.stdout.flush()
+            await asyncio.sleep(1)
+            count += 1
+            if count > tout:
+                raise HPOneViewTimeout('Waited ' + str(tout) +
+                                       ' seconds for task to complete, '
+                                       'aborting')
+        task = await self._con.get(task['uri'])
+        if task['taskState'] in TaskErrorStates and \
+                task['taskState'] != 'Warning':
+            err = task['taskErrors'][0]
+            msg = err['message']
+            if msg is not None:
+                raise HPOneViewTaskError(msg)
+            elif task['taskStatus'] is not None:
+                raise HPOneViewTaskError(task['taskStatus'])
+            else:
+                raise HPOneViewTaskError('Unknown Exception')
+        return task
+
+    async def wait4tasks(self, tasks, tout=60, verbose=False):
+        return await asyncio.gather(*[self.wait4task(task, tout, verbose)
+                                      for task in tasks])
+
+    async def get_tasks(self):
+        return get_members(await self._con.get(uri['task']))
+
+    ###########################################################################
+    # Alerts
+    ###########################################################################
+    async def get_alerts(self, AlertState='All'):
+        if AlertState == 'All':
+            return get_members(await self._con.get(uri['alerts'] +
+                                                   '?start=0&count=9999999'))
+        return await self._con.get_entities_byfield(uri['alerts'],
+                                                    'alertState', AlertState,
+                                                    count=9999999)
+
+    async def delete_alert(self, alert):
+        await self._con.delete(alert['uri'])
+
+    async def update_alert(self, alert, alertMap):
+        task, moddedAlert = await self._con.put(alert['uri'], alertMap)
+        return moddedAlert
+
+    ###########################################################################
+    # Audit Logs and Events
+    ###########################################################################
+    async def get_audit_logs(self, query=''):
+        return get_members(await self._con.get(uri['audit-logs'] + '?' +
+                                               query))
+
+    async def get_events(self, query=''):
+        return get_members(await self._con.get(uri['events'] + '?' + query))
+
+
+class AsyncServers(object):
+    """ asyncio counterpart of the servers class."""
+
+    def __init__(self, con):
+        self._con = con
+        self._activity = AsyncActivity(con)
+
+    async def _wait_for_resource(self, task, tout, verbose):
+        task = await self._activity.wait4task(task, tout, verbose=verbose)
+        if 'type' in task and task['type'].startswith('Task'):
+            entity = await self._activity.get_task_associated_resource(task)
+            return await self._con.get(entity['resourceUri'])
+        return task
+
+    ###########################################################################
+    # Server Hardware
+    ###########################################################################
+    async def get_server_by_bay(self, baynum):
+        return await self._con.get_entity_byfield(uri['servers'], 'position',
+                                                  baynum)
+
+    async def get_server_by_name(self, name):
+        return await self._con.get_entity_byfield(uri['servers'], 'name',
+                                                  name)
+
+    async def get_servers(self):
+        return get_members(await self._con.get(uri['servers']))
+
+    async def get_server_hardware_types(self):
+        return get_members(await self._con.get(uri['server-hardware-types']))
+
+    async def set_server_powerstate(self, server, state, force=False,
+                                    blocking=True, verbose=False):
+        if state == 'Off' and force is True:
+            powerRequest = make_powerstate_dict('Off', 'PressAndHold')
+        elif state == 'Off' and force is False:
+            powerRequest = make_powerstate_dict('Off', 'MomentaryPress')
+        elif state == 'On':
+            powerRequest = make_powerstate_dict('On', 'MomentaryPress')
+        elif state == 'Reset':
+            powerRequest = make_powerstate_dict('On', 'Reset')
+        task, body = await self._con.put(server['uri'] + '/powerState',
+                                         powerRequest)
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=60,
+                                                  verbose=verbose)
+        return task
+
+    async def delete_server(self, server, force=False, blocking=True,
+                            verbose=False):
+        if force:
+            task, body = await self._con.delete(server['uri'] + '?force=True')
+        else:
+            task, body = await self._con.delete(server['uri'])
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=600,
+                                                  verbose=verbose)
+        return task
+
+    async def update_server(self, server):
+        task, body = await self._con.put(server['uri'], server)
+        return body
+
+    async def add_server(self, server, blocking=True, verbose=False):
+        task, body = await self._con.post(uri['servers'], server)
+        if blocking is True:
+            return await self._wait_for_resource(task, 600, verbose)
+        return task
+
+    ###########################################################################
+    # Server Profiles
+    ###########################################################################
+    async def post_server_profile(self, profile, blocking=True,
+                                  verbose=False):
+        """ POST a ServerProfileV5 profile, as built by make_ServerProfileV5
+        """
+        task, body = await self._con.post(uri['profiles'], profile)
+        tout = 600 if profile['firmware'] is None else 3600
+        if blocking is True:
+            return await self._wait_for_resource(task, tout, verbose)
+        return task
+
+    async def remove_server_profile(self, profile, force=False, blocking=True,
+                                    verbose=False):
+        if force:
+            task, body = await self._con.delete(profile['uri'] +
+                                                '?force=True')
+        else:
+            task, body = await self._con.delete(profile['uri'])
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=600,
+                                                  verbose=verbose)
+        return task
+
+    async def get_server_profiles(self):
+        return get_members(await self._con.get(uri['profiles']))
+
+    async def get_server_profile_by_name(self, name):
+        return await self._con.get_entity_byfield(uri['profiles'], 'name',
+                                                  name)
+
+    async def get_server_profile_templates(self):
+        return get_members(await self._con.get(uri['profile-templates']))
+
+    ###########################################################################
+    # Enclosures
+    ###########################################################################
+    async def get_enclosures(self):
+        return get_members(await self._con.get(uri['enclosures']))
+
+    async def get_enclosure_groups(self):
+        return get_members(await self._con.get(uri['enclosureGroups']))
+
+
+class AsyncNetworking(object):
+    """ asyncio counterpart of the networking class."""
+
+    def __init__(self, con):
+        self._con = con
+        self._activity = AsyncActivity(con)
+
+    async def get_ligs(self):
+        return get_members(await self._con.get(uri['lig']))
+
+    async def get_lig_by_name(self, ligname):
+        return await self._con.get_entity_byfield(uri['lig'], 'name', ligname)
+
+    async def get_lis(self, filter=''):
+        return get_members(await self._con.get(uri['li'] + filter))
+
+    async def get_connection_templates(self):
+        return get_members(await self._con.get(uri['ct']))
+
+    async def update_net_ctvalues(self, xnet, bw={}):
+        if not bw:
+            return
+        if not xnet:
+            raise HPOneViewInvalidResource('Missing Network')
+        defaultCT = await self._con.get(xnet['connectionTemplateUri'])
+        defaultCT['bandwidth']['maximumBandwidth'] = bw['maximumBandwidth']
+        defaultCT['bandwidth']['typicalBandwidth'] = bw['typicalBandwidth']
+        task, body = await self._con.put(defaultCT['uri'], defaultCT)
+        return await self._activity.make_task_entity_tuple(task)
+
+    async def get_networksets(self):
+        return get_members(await self._con.get(uri['nset']))
+
+    async def create_enet_network(self, name, description=None,
+                                  ethernetNetworkType=None, purpose='General',
+                                  privateNetwork=False, smartLink=True,
+                                  vlanId=0, typicalBandwidth=2500,
+                                  maximumBandwidth=10000, blocking=True,
+                                  verbose=False):
+        bw = make_Bandwidth(typicalBandwidth, maximumBandwidth)
+        xnet = make_ethernet_networkV3(name=name,
+                                       ethernetNetworkType=ethernetNetworkType,
+                                       purpose=purpose,
+                                       privateNetwork=privateNetwork,
+                                       smartLink=smartLink,
+                                       vlanId=vlanId)
+        task, entity = await self.create_network(uri['enet'], xnet, bw,
+                                                 verbose)
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=60,
+                                                  verbose=verbose)
+        return entity
+
+    async def create_network(self, uri, xnet, bw={}, verbose=False):
+        body = await self._con.conditional_post(uri, xnet)
+        task, entity = await self._activity.make_task_entity_tuple(body)
+        if not task and not entity:
+            # conditional_post returned an already existing resource
+            return None, body
+        await self.update_net_ctvalues(entity, bw)
+        return task, entity
+
+    async def update_network(self, xnet):
+        task, body = await self._con.put(xnet['uri'], xnet)
+        return await self._activity.make_task_entity_tuple(task)
+
+    async def delete_network(self, xnet, blocking=True, verbose=False):
+        task, body = await self._con.delete(xnet['uri'])
+        if blocking is True:
+            task = await self._activity.wait4task(task, verbose=verbose)
+        return task
+
+    async def get_enet_networks(self):
+        return get_members(await self._con.get(uri['enet']))
+
+    async def get_fc_networks(self):
+        return get_members(await self._con.get(uri['fcnet']))
+
+    async def get_uplink_sets(self):
+        return get_members(await self._con.get(uri['uplink-sets']))
+
+    async def get_interconnects(self):
+        return get_members(await self._con.get(uri['ic']))
+
+    async def get_enet_network_by_name(self, nwname):
+        return await self._con.get_entity_byfield(uri['enet'], 'name', nwname)
+
+    async def get_fc_network_by_name(self, nwname):
+        return await self._con.get_entity_byfield(uri['fcnet'], 'name',
+                                                  nwname)
+
+
+class AsyncStorage(object):
+    """ asyncio counterpart of the storage class."""
+
+    def __init__(self, con):
+        self._con = con
+        self._activity = AsyncActivity(con)
+
+    async def get_storage_systems(self):
+        return get_members(await self._con.get(uri['storage-systems']))
+
+    async def get_storage_pools(self):
+        return await self._con.get(uri['storage-pools'])
+
+    async def get_attachable_volumes(self):
+        return await self._con.get(uri['attachable-volumes'])
+
+    async def get_storage_volume_templates(self):
+        return await self._con.get(uri['vol-templates'])
+
+    async def add_storage_volume(self, volume, blocking=True, verbose=False):
+        task, body = await self._con.post(uri['storage-volumes'], volume)
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=600,
+                                                  verbose=verbose)
+            if 'type' in task and task['type'].startswith('Task'):
+                entity = await self._activity.get_task_associated_resource(
+                    task)
+                return await self._con.get(entity['resourceUri'])
+        return task
+
+    async def remove_storage_volume(self, volume, blocking=True,
+                                    verbose=False):
+        task, body = await self._con.delete(volume['uri'])
+        if blocking is True:
+            task = await self._activity.wait4task(task, tout=600,
+                                                  verbose=verbose)
+        return task
+
+    async def get_storage_volumes(self):
+        return await self._con.get(uri['storage-volumes'] +
+                                   '?start=0&count=999999')
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+breaker.py
+~~~~~~~~~~~~
+
+This module implements a circuit breaker that stops sending requests to an
+appliance that keeps failing until it is healthy again
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'breaker'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import http.client
+import socket
+import ssl
+import threading
+import time
+
+from hpOneView.exceptions import HPOneViewCircuitOpen
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker(object):
+    """ Fails requests fast while an appliance is unreachable or restarting.
+
+    The breaker is closed while the appliance answers. After
+    ``failureThreshold`` consecutive failures (connection errors or a
+    502/503/504 status) it opens, and requests raise HPOneViewCircuitOpen
+    without being sent. Once ``resetTimeout`` seconds have passed it goes
+    half-open: the next request first probes ``probeUri`` and the breaker
+    closes if the probe succeeds, or opens again for another
+    ``resetTimeout`` if it fails. Only one caller probes at a time.
+
+    Attach a breaker with connection.set_circuit_breaker, sharing it between
+    the connections to the same appliance. Listeners receive an event dict
+    on every state change, with the keys 'name', 'previous', 'state',
+    'failures' and 'time', so schedulers can route work elsewhere while
+    the appliance is down.
+
+    Args:
+        failureThreshold:
+            Consecutive failures that open the breaker.
+        resetTimeout:
+            Seconds the breaker stays open before a probe is attempted.
+        probeUri:
+            URI requested to check the appliance is healthy again.
+        failureStatuses:
+            HTTP statuses counted as failures.
+        name:
+            Name reported in events, such as the appliance address.
+    """
+
+    def __init__(self, failureThreshold=5, resetTimeout=30,
+                 probeUri='/rest/version', failureStatuses=(502, 503, 504),
+                 name=None):
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self.probeUri = probeUri
+        self.failureStatuses = frozenset(failureStatuses)
+        self.name = name
+        self._state = CLOSED
+        self._failures = 0
+        self._openedAt = None
+        self._probing = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    @property
+    def failures(self):
+        return self._failures
+
+    def add_listener(self, callback):
+        """ Call ``callback(event)`` on every state change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def is_failure(self, error=None, status=None):
+        """ Return True if an attempt ending with ``error`` or ``status``
+        counts against the appliance."""
+        if error is not None:
+            if isinstance(error, (ssl.SSLError, ssl.CertificateError)):
+                # Certificate problems are not appliance outages
+                return False
+            return isinstance(error, (http.client.HTTPException,
+                                      socket.error))
+        return status in self.failureStatuses
+
+    def before_request(self):
+        """ Return True if the caller must probe the appliance before
+        sending its request, False if it may go ahead, or raise
+        HPOneViewCircuitOpen."""
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN:
+                if time.time() - self._openedAt < self.resetTimeout:
+                    raise HPOneViewCircuitOpen(self._message())
+                event = self._transition(HALF_OPEN)
+            else:
+                event = None
+            if self._probing:
+                raise HPOneViewCircuitOpen(self._message())
+            self._probing = True
+        self._notify(event)
+        return True
+
+    def probe_finished(self, healthy):
+        """ Report the outcome of the probe requested by before_request."""
+        with self._lock:
+            self._probing = False
+            if healthy:
+                self._failures = 0
+                event = self._transition(CLOSED)
+            else:
+                self._openedAt = time.time()
+                event = self._transition(OPEN)
+        self._notify(event)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            event = None
+            if self._state != CLOSED:
+                event = self._transition(CLOSED)
+        self._notify(event)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            event = None
+            if (self._state == CLOSED and
+                    self._failures >= self.failureThreshold):
+                self._openedAt = time.time()
+                event = self._transition(OPEN)
+        self._notify(event)
+
+    def reset(self):
+        """ Close the breaker and forget past failures."""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            event = None
+            if self._state != CLOSED:
+                event = self._transition(CLOSED)
+        self._notify(event)
+
+    def _message(self):
+        return ('Circuit breaker for %s is %s after %d consecutive failures'
+                % (self.name or 'appliance', self._state, self._failures))
+
+    def _transition(self, state):
+        # Called with the lock held; returns the event to deliver once the
+        # lock is released
+        if state == self._state:
+            return None
+        event = {'name': self.name, 'previous': self._state, 'state': state,
+                 'failures': self._failures, 'time': time.time()}
+        self._state = state
+        return event
+
+    def _notify(self, event):
+        if event is None:
+            return
+        for callback in list(self._listeners):
+            callback(event)
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
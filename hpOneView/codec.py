@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+codec.py
+~~~~~~~~~~~~
+
+This module implements the JSON codec used to encode request bodies and
+decode responses, picking the fastest JSON library installed
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'codec'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import json
+
+
+class JSONCodec(object):
+    """ JSON encoder and decoder working on UTF-8 bytes.
+
+    Args:
+        name:
+            Name of the JSON library.
+        loads:
+            Callable decoding UTF-8 bytes, raising ValueError on bad input.
+        dumps:
+            Callable encoding an object to UTF-8 bytes.
+    """
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return 'JSONCodec(%r)' % self.name
+
+
+def _stdlib_loads(data):
+    # json.loads only accepts bytes from Python 3.6 on
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj).encode('utf-8')
+
+
+def _orjson_codec():
+    import orjson
+    return JSONCodec('orjson', orjson.loads, orjson.dumps)
+
+
+def _ujson_codec():
+    import ujson
+
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False,
+                           escape_forward_slashes=False).encode('utf-8')
+    return JSONCodec('ujson', ujson.loads, dumps)
+
+
+def _simplejson_codec():
+    import simplejson
+
+    def dumps(obj):
+        return simplejson.dumps(obj).encode('utf-8')
+    return JSONCodec('simplejson', simplejson.loads, dumps)
+
+
+def _stdlib_codec():
+    return JSONCodec('json', _stdlib_loads, _stdlib_dumps)
+
+
+_FACTORIES = [('orjson', _orjson_codec), ('ujson', _ujson_codec),
+              ('simplejson', _simplejson_codec), ('json', _stdlib_codec)]
+
+
+def available_codecs():
+    """ Return the names of the JSON libraries that can be imported."""
+    names = []
+    for name, factory in _FACTORIES:
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def make_codec(name=None):
+    """ Build the codec for the library ``name``, or for the fastest
+    library installed when name is None."""
+    for candidate, factory in _FACTORIES:
+        if name is not None and candidate != name:
+            continue
+        try:
+            return factory()
+        except ImportError:
+            if name is not None:
+                raise
+    raise ValueError('Unknown JSON codec: %s' % name)
+
+
+_codec = make_codec()
+
+
+def get_codec():
+    return _codec
+
+
+def set_codec(codec):
+    """ Select the JSON codec used by every connection.
+
+    Args:
+        codec:
+            A library name ('orjson', 'ujson', 'simplejson' or 'json'),
+            a JSONCodec, or None for the fastest library installed.
+
+    Returns: the previous codec.
+    """
+    global _codec
+    previous = _codec
+    if not isinstance(codec, JSONCodec):
+        codec = make_codec(codec)
+    _codec = codec
+    return previous
+
+
+def loads(data):
+    """ Decode JSON from UTF-8 bytes (or text)."""
+    return _codec.loads(data)
+
+
+def dumps(obj):
+    """ Encode ``obj`` to JSON as UTF-8 bytes."""
+    return _codec.dumps(obj)
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -234,6 +234,12 @@ def get_members(mlist):
     return mlist['members']
 
 
+def is_paged_query(query):
+    """ Return True if a query string already selects a start or count."""
+    return any(param.startswith(('start=', 'count='))
+               for param in query.split('&'))
+
+
 def get_member(mlist):
     if not mlist:
         return None
@@ -11,7 +11,6 @@ from __future__ import unicode_literals
 from __future__ import division
 from __future__ import absolute_import
 from builtins import open
-from builtins import str
 from future import standard_library
 standard_library.install_aliases()
 
@@ -44,19 +43,480 @@ __status__ = 'Development'
 # THE SOFTWARE.
 ###
 
+import collections
+import copy
+import errno
 import http.client
-import json
 import shutil  # for shutil.copyfileobj()
-import mmap  # so we can upload the iso without having to load it in memory
 import os
+import socket
 import ssl
+import threading
 import time
+import zlib
 
+from hpOneView import codec
 from hpOneView.common import *
+from hpOneView.cursor import DEFAULT_PAGE_SIZE
+from hpOneView.cursor import PageCursor
+from hpOneView.cursor import PageSizer
+from hpOneView.cursor import page_uri
+from hpOneView.cursor import split_page_uri
+from hpOneView.deadline import check_deadline
+from hpOneView.deadline import current_deadline
+from hpOneView.deadline import deadline
+from hpOneView.deadline import remaining_time
 from hpOneView.exceptions import *
+from hpOneView.query import Query
+from hpOneView.query import eq
+from hpOneView.query import gt
+from hpOneView.query import lt
+from hpOneView.query import project
+from hpOneView.governor import TokenBucket
+from hpOneView.retry import RetryPolicy
+from hpOneView.transfer import MultipartFileEncoder
+from hpOneView.transfer import TransferProgress
+
+
+class _ConnectionPool(object):
+    """Bounded, thread-safe pool of persistent keep-alive connections.
+
+    Connections are created on demand by ``factory`` up to ``maxsize``; once
+    that many are checked out, further callers block until one is released.
+    Idle connections are reused most-recently-used first and are closed
+    rather than reused once they have been idle for ``idleTimeout`` seconds.
+    """
+
+    def __init__(self, factory, maxsize=10, idleTimeout=60):
+        self._factory = factory
+        self._maxsize = maxsize
+        self._idleTimeout = idleTimeout
+        self._idle = []
+        self._inUse = 0
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def configure(self, maxsize=None, idleTimeout=None):
+        with self._cond:
+            if maxsize is not None:
+                self._maxsize = maxsize
+            if idleTimeout is not None:
+                self._idleTimeout = idleTimeout
+            self._cond.notify_all()
+
+    def _evict_idle(self):
+        # The idle list is ordered oldest first, so stop at the first
+        # connection that is still fresh enough.
+        now = time.time()
+        while self._idle and now - self._idle[0][1] > self._idleTimeout:
+            conn, released = self._idle.pop(0)
+            conn.close()
+
+    def acquire(self):
+        """Check out a connection, returning ``(conn, reused)``."""
+        with self._cond:
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    conn, released = self._idle.pop()
+                    self._inUse += 1
+                    return conn, True
+                if self._inUse < self._maxsize:
+                    self._inUse += 1
+                    generation = self._generation
+                    break
+                self._cond.wait()
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._inUse -= 1
+                self._cond.notify()
+            raise
+        conn._poolGeneration = generation
+        return conn, False
+
+    def release(self, conn, reusable=True):
+        """Return a connection whose response has been fully read.
+
+        The connection is closed instead of pooled when ``reusable`` is
+        False, when the server asked to close it, or when the pool has been
+        cleared since it was created.
+        """
+        with self._cond:
+            self._inUse -= 1
+            if (reusable and conn.sock is not None and
+                    getattr(conn, '_poolGeneration', None) == self._generation):
+                self._idle.append((conn, time.time()))
+            else:
+                conn.close()
+            self._cond.notify()
+
+    def clear(self):
+        """Close idle connections and retire those currently checked out."""
+        with self._cond:
+            self._generation += 1
+            while self._idle:
+                conn, released = self._idle.pop()
+                conn.close()
+
+
+def _is_stale_connection_error(e):
+    # A pooled keep-alive connection that the appliance closed while it sat
+    # idle fails with a reset or an empty status line. A request that fails
+    # this way on a reused connection never reached the appliance and is sent
+    # again on a new one.
+    if isinstance(e, http.client.BadStatusLine):
+        return True
+    return (isinstance(e, socket.error) and
+            getattr(e, 'errno', None) in (errno.ECONNRESET, errno.EPIPE,
+                                          errno.ECONNABORTED))
+
+
+class _Flight(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class _SingleFlight(object):
+    """Coalesces concurrent identical calls into one.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for it. The result itself stays with the flight and
+    every caller that shared it, the first one included, gets a deep copy,
+    or the exception, so each can modify what it receives freely.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+        if not leader:
+            if not flight.done.wait(remaining_time()):
+                check_deadline('Request')
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+        try:
+            flight.result = fn()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                shared = flight.followers > 0
+            flight.done.set()
+        if shared:
+            return copy.deepcopy(flight.result)
+        return flight.result
+
+
+class _ETagCache(object):
+    """LRU cache of raw GET bodies by URI and headers, with their ETag.
+
+    The bytes are kept rather than the decoded body: decoding them again
+    on a hit is cheaper than deep copying the decoded objects, and every
+    caller gets objects of its own."""
+
+    def __init__(self, maxEntries=256):
+        self.maxEntries = maxEntries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def lookup(self, key):
+        # Returns (etag, raw body bytes) or None
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def store(self, key, etag, body):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (etag, body)
+            self.stats['stored'] += 1
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+    def count(self, hit):
+        with self._lock:
+            self.stats['hits' if hit else 'misses'] += 1
+
+    def invalidate(self, path):
+        # Drop the entries of a changed resource, its collection and any
+        # resource below it
+        path = path.split('?')[0]
+        with self._lock:
+            for key in list(self._entries):
+                cached = key[0].split('?')[0]
+                if cached.startswith(path) or path.startswith(cached):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+class _PageFetch(threading.Thread):
+    """Fetches one collection page in the background."""
+
+    def __init__(self, con, uri, headers):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self._con = con
+        self._uri = uri
+        self._headers = headers
+        # Deadlines are per thread, so the caller's is carried over
+        self._deadline = current_deadline()
+        self._body = None
+        self._error = None
+        self.elapsed = 0.0
+        self.nbytes = 0
+
+    def run(self):
+        try:
+            if self._deadline is None:
+                self._body, self.elapsed, self.nbytes = \
+                    self._con._timed_fetch(self._uri, self._headers)
+            else:
+                with deadline(self._deadline.remaining()):
+                    self._body, self.elapsed, self.nbytes = \
+                        self._con._timed_fetch(self._uri, self._headers)
+        except Exception as e:
+            self._error = e
+
+    def result(self):
+        self.join(remaining_time())
+        if self.is_alive():
+            check_deadline('Fetching ' + self._uri)
+        if self._error is not None:
+            raise self._error
+        return self._body
+
+
+class _TLSSessionCache(object):
+    """Most recent TLS session negotiated with the appliance.
+
+    New sockets offer it to the appliance so that reconnects are abbreviated
+    handshakes instead of full key exchanges.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            return self._session
+
+    def set(self, session):
+        if session is not None:
+            with self._lock:
+                self._session = session
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that resumes TLS sessions across sockets."""
+
+    def __init__(self, *args, **kwargs):
+        self._tlsSessions = kwargs.pop('tlsSessions', None)
+        http.client.HTTPSConnection.__init__(self, *args, **kwargs)
+
+    def connect(self):
+        # SSLSocket.session only exists on Python 3.6 and later
+        if self._tlsSessions is None or not hasattr(ssl.SSLSocket, 'session'):
+            return http.client.HTTPSConnection.connect(self)
+        # Open the TCP socket (and proxy tunnel), then do the TLS handshake
+        # ourselves so a previous session can be offered for resumption.
+        http.client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host or self.host
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=server_hostname,
+            session=self._tlsSessions.get())
+        self._tlsSessions.set(self.sock.session)
+
+
+def _make_ssl_context(trustAll, trustedBundle):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
+    if trustAll is False:
+        context.verify_mode = ssl.CERT_REQUIRED
+        context.load_verify_locations(trustedBundle)
+    else:
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _decode_body(tempbytes, default):
+    # Responses are JSON documents, plain text or binary downloads; an
+    # empty response leaves ``default`` (the request body) in place. JSON
+    # is decoded straight from the received bytes.
+    if not tempbytes:
+        if isinstance(default, bytes):
+            return default.decode('utf-8')
+        return default
+    try:
+        return codec.loads(tempbytes)
+    except ValueError:
+        pass
+    try:
+        return tempbytes.decode('utf-8')
+    except UnicodeDecodeError:  # Might be binary data
+        return tempbytes
+
+
+def _page_members(body, fields=None):
+    members = get_members(body)
+    if fields:
+        members = [project(member, fields) for member in members]
+    return members
+
+
+# Default socket timeouts in seconds, see connection.set_timeouts
+_CONNECT_TIMEOUT = 30
+_READ_TIMEOUT = 300
+
+
+def _deadline_allows(delay):
+    # True if waiting ``delay`` seconds still leaves time for another attempt
+    active = current_deadline()
+    return active is None or delay < active.remaining()
+
+
+def _raise_if_deadline_passed(error):
+    # A socket timeout caused by the deadline is reported as a deadline
+    active = current_deadline()
+    if isinstance(error, socket.timeout) and active is not None:
+        active.check('Request')
+
+
+# Size of the reads used to stream a response body through decompression
+_READ_CHUNK_SIZE = 65536
+# Default size of the chunks yielded by connection.get_stream
+_STREAM_CHUNK_SIZE = 1048576
+# Redirects followed by connection.get_stream, and at most how many
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+
+class _ContentDecoder(object):
+    """Incrementally undo a gzip or deflate Content-Encoding."""
+
+    def __init__(self, encoding):
+        self.encoding = (encoding or 'identity').strip().lower()
+        self._started = False
+        if self.encoding in ('gzip', 'x-gzip'):
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self._obj = zlib.decompressobj()
+        else:
+            self._obj = None
+
+    def decompress(self, data):
+        if self._obj is None or not data:
+            return data
+        if self._started or self.encoding != 'deflate':
+            return self._obj.decompress(data)
+        self._started = True
+        # "deflate" is meant to be zlib wrapped, but some servers send a raw
+        # deflate stream; fall back to that if the zlib header is missing.
+        try:
+            return self._obj.decompress(data)
+        except zlib.error:
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._obj.decompress(data)
+
+    def flush(self):
+        if self._obj is None:
+            return b''
+        return self._obj.flush()
+
+
+class _TransferStats(object):
+    """Thread-safe counters of response bytes on the wire and decoded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'responses': 0, 'compressedResponses': 0,
+                       'wireBytes': 0, 'decodedBytes': 0}
+
+    def record(self, wireBytes, decodedBytes, encoding='identity'):
+        with self._lock:
+            self._stats['responses'] += 1
+            if encoding != 'identity':
+                self._stats['compressedResponses'] += 1
+            self._stats['wireBytes'] += wireBytes
+            self._stats['decodedBytes'] += decodedBytes
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+class _PageState(threading.local):
+    """Pagination bookkeeping of the last collection GET, kept per thread."""
+    nextPage = None
+    prevPage = None
+    numTotalRecords = 0
+    numDisplayedRecords = 0
+    # Decoded size of the last response read by the thread
+    responseBytes = 0
+
+
+def _page_state_property(name):
+    return property(lambda self: getattr(self._pageState, name),
+                    lambda self, value: setattr(self._pageState, name, value))
 
 
 class connection(object):
+    """ Session with one HP OneView appliance.
+
+    A single connection may be shared by any number of threads once it has
+    been configured and logged in:
+
+    * Requests run concurrently over the connection pool; extra headers for
+      one request are passed as a ``headers`` overlay and never modify the
+      headers shared by other requests.
+    * The pagination state used by getNextPage/getPrevPage (and the
+      ``common.pages`` iterator) is kept per thread, so each thread walks
+      its own collection.
+    * login and logout swap the session headers atomically. Configuration
+      calls (set_proxy, set_trusted_ssl_bundle, set_connection_pool) are
+      safe to make at any time but are meant to be done before the
+      connection is handed to worker threads.
+    """
+
+    _nextPage = _page_state_property('nextPage')
+    _prevPage = _page_state_property('prevPage')
+    _numTotalRecords = _page_state_property('numTotalRecords')
+    _numDisplayedRecords = _page_state_property('numDisplayedRecords')
 
     def __init__(self, applianceIp):
         self._session = None
@@ -66,17 +526,32 @@ class connection(object):
         self._headers = {
             'X-API-Version': self._apiVersion,
             'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
             'Content-Type': 'application/json'}
+        self._transferStats = _TransferStats()
         self._proxyHost = None
         self._proxyPort = None
         self._doProxy = False
         self._sslTrustedBundle = None
         self._sslTrustAll = True
-        self._nextPage = None
-        self._prevPage = None
-        self._numTotalRecords = 0
-        self._numDisplayedRecords = 0
+        self._sslContext = None
+        self._sslLock = threading.Lock()
+        self._tlsSessions = None
+        self._pageState = _PageState()
+        self._headersLock = threading.Lock()
         self._validateVersion = False
+        self._pool = _ConnectionPool(self._open_connection)
+        self._retryPolicy = RetryPolicy()
+        self._governor = None
+        self._breaker = None
+        self._singleFlight = _SingleFlight()
+        self._etagCache = None
+        self._sessionCache = None
+        self._loginLock = threading.Lock()
+        self._reauthenticate = True
+        self._connectTimeout = _CONNECT_TIMEOUT
+        self._readTimeout = _READ_TIMEOUT
+        self._pageSizer = PageSizer()
 
     def validateVersion(self):
         version = self.get(uri['version'])
@@ -92,10 +567,191 @@ class connection(object):
         self._proxyHost = proxyHost
         self._proxyPort = proxyPort
         self._doProxy = True
+        self._pool.clear()
 
     def set_trusted_ssl_bundle(self, sslBundle):
         self._sslTrustAll = False
         self._sslTrustedBundle = sslBundle
+        with self._sslLock:
+            self._sslContext = None
+        self._pool.clear()
+
+    def set_retry_policy(self, policy):
+        """ Replace the RetryPolicy applied to every request.
+
+        Pass RetryPolicy(maxAttempts=1) to disable retries.
+        """
+        self._retryPolicy = policy
+
+    def set_governor(self, governor):
+        """ Attach a RequestGovernor limiting the request rate and the
+        number of in-flight requests to the appliance, or None to remove it.
+        """
+        self._governor = governor
+
+    def get_governor(self):
+        return self._governor
+
+    def set_coalescing(self, enabled=True):
+        """ Turn on or off the sharing of one request between concurrent
+        identical GETs (on by default)."""
+        self._singleFlight = _SingleFlight() if enabled else None
+
+    def get_coalesced_count(self):
+        """ Number of GETs answered by another thread's request."""
+        return self._singleFlight.coalesced if self._singleFlight else 0
+
+    def set_etag_cache(self, maxEntries=256):
+        """ Remember the ETag and body of GET responses and revalidate them
+        with If-None-Match, so an unchanged resource costs a bodyless 304.
+
+        Args:
+            maxEntries:
+                Number of responses kept, least recently used first out.
+                Use 0 or None to disable the cache.
+        """
+        self._etagCache = _ETagCache(maxEntries) if maxEntries else None
+
+    def get_etag_cache_stats(self):
+        """ Return the 'hits' (304 answers), 'misses', 'stored' and
+        'entries' counts of the ETag cache, or None if it is disabled."""
+        cache = self._etagCache
+        return cache.snapshot() if cache is not None else None
+
+    def set_session_cache(self, cache):
+        """ Attach a SessionCache so login reuses the session stored by an
+        earlier process, or None to always log in."""
+        self._sessionCache = cache
+
+    def set_reauthentication(self, enabled=True):
+        """ Turn on or off logging in again, with the credentials given to
+        login, when the appliance rejects an expired session (on by
+        default)."""
+        self._reauthenticate = enabled
+
+    def _relogin(self, staleAuth):
+        # Log in again after a request sent with ``staleAuth`` got a 401.
+        # Returns True once a new session is in place, whether this thread
+        # or a concurrent one created it; the lock keeps threads hitting
+        # the expiry together from each creating a session.
+        if self._cred is None or not self._reauthenticate:
+            return False
+        with self._loginLock:
+            if self._headers.get('auth') != staleAuth:
+                return True
+            if self._sessionCache is not None:
+                self._sessionCache.forget(self._host, self._cred)
+            # The stale session stays in the shared headers until login
+            # replaces it, so requests sent meanwhile still get a 401 that
+            # makes them wait on the lock and replay with the new session
+            self.login(self._cred)
+        return True
+
+    def set_circuit_breaker(self, breaker):
+        """ Attach a CircuitBreaker that fails requests fast while the
+        appliance keeps failing, or None to remove it."""
+        if breaker is not None and breaker.name is None:
+            breaker.name = self._host
+        self._breaker = breaker
+
+    def get_circuit_breaker(self):
+        return self._breaker
+
+    def _check_breaker(self):
+        breaker = self._breaker
+        if breaker is None or not breaker.before_request():
+            return
+        healthy = self._probe_appliance(breaker.probeUri)
+        breaker.probe_finished(healthy)
+        if not healthy:
+            raise HPOneViewCircuitOpen('Appliance ' + self._host +
+                                       ' is still unavailable')
+
+    def _record_attempt(self, error=None, status=None):
+        breaker = self._breaker
+        if breaker is None:
+            return
+        if breaker.is_failure(error, status):
+            breaker.record_failure()
+        elif error is None:
+            breaker.record_success()
+
+    def _probe_appliance(self, probeUri):
+        # Health check on a fresh socket, bypassing the pool and the breaker
+        conn = self.get_connection()
+        try:
+            conn.timeout = remaining_time(self._connectTimeout)
+            conn.connect()
+            conn.sock.settimeout(remaining_time(self._readTimeout))
+            conn.request('GET', probeUri, '', self._request_headers(None))
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status == 200
+        except (http.client.HTTPException, socket.error):
+            return False
+        finally:
+            conn.close()
+
+    def set_connection_pool(self, maxPerHost=None, idleTimeout=None):
+        """ Tune the pool of persistent connections to the appliance.
+
+        Args:
+            maxPerHost:
+                Maximum number of simultaneous connections to the appliance.
+                Requests beyond this wait for a connection to be released.
+            idleTimeout:
+                Seconds an idle keep-alive connection is kept before it is
+                closed instead of reused.
+        """
+        self._pool.configure(maxPerHost, idleTimeout)
+
+    def set_timeouts(self, connect=None, read=None):
+        """ Set the socket timeouts applied to every request.
+
+        Args:
+            connect:
+                Seconds allowed to open the connection, TLS handshake
+                included, or None to wait forever.
+            read:
+                Seconds a request may wait for the appliance to send data,
+                or None to wait forever.
+
+        Within a deadline block the time left is used when it is shorter.
+        """
+        self._connectTimeout = connect
+        self._readTimeout = read
+
+    def set_page_sizer(self, sizer):
+        """ Set the PageSizer choosing the page size of collection reads
+        made without an explicit page_size, or None to always request
+        DEFAULT_PAGE_SIZE members. Share one sizer between connections to
+        the same appliance to share what it learns."""
+        self._pageSizer = sizer
+
+    def get_page_sizer(self):
+        return self._pageSizer
+
+    def get_page_size_stats(self):
+        """ Return the page sizes learned per collection, see
+        PageSizer.get_stats."""
+        if self._pageSizer is None:
+            return {}
+        return self._pageSizer.get_stats()
+
+    def _prepare_connection(self, conn):
+        # Apply the timeouts, bounded by the current deadline, and connect
+        active = current_deadline()
+        if active is not None:
+            active.check('Request')
+        self._check_breaker()
+        conn.timeout = remaining_time(self._connectTimeout)
+        if conn.sock is None:
+            conn.connect()
+        conn.sock.settimeout(remaining_time(self._readTimeout))
+
+    def close(self):
+        """ Close all pooled connections to the appliance."""
+        self._pool.clear()
 
     def get_session(self):
         return self._session
@@ -112,62 +768,166 @@ class connection(object):
     def make_url(self, path):
         return 'https://%s%s' % (self._host, path)
 
-    def do_http(self, method, path, body):
-        bConnected = False
-        while bConnected is False:
+    def _request_headers(self, headers=None):
+        # self._headers is only ever replaced, never modified in place, so a
+        # snapshot of it is consistent even while another thread logs in.
+        # A None value in ``headers`` leaves that header out.
+        reqHeaders = dict(self._headers)
+        if headers:
+            reqHeaders.update(headers)
+            for key, value in headers.items():
+                if value is None:
+                    del reqHeaders[key]
+        return reqHeaders
+
+    def _update_headers(self, add=None, remove=()):
+        with self._headersLock:
+            headers = dict(self._headers)
+            headers.update(add or {})
+            for key in remove:
+                headers.pop(key, None)
+            self._headers = headers
+
+    def _read_body(self, resp):
+        # Read the body in chunks, decompressing each as it arrives so the
+        # compressed and decoded copies never both have to be held whole.
+        decoder = _ContentDecoder(resp.getheader('Content-Encoding'))
+        chunks = []
+        wireBytes = 0
+        while True:
+            data = resp.read(_READ_CHUNK_SIZE)
+            if not data:
+                break
+            wireBytes += len(data)
+            chunks.append(decoder.decompress(data))
+        chunks.append(decoder.flush())
+        tempbytes = b''.join(chunks)
+        self._transferStats.record(wireBytes, len(tempbytes),
+                                   decoder.encoding)
+        self._pageState.responseBytes = len(tempbytes)
+        return tempbytes
+
+    def get_transfer_stats(self):
+        """ Return counters of response bytes received and decoded.
+
+        Returns: dict with the number of 'responses', how many of them were
+        'compressedResponses', and the total 'wireBytes' read from the
+        appliance versus 'decodedBytes' after decompression.
+        """
+        return self._transferStats.snapshot()
+
+    def reset_transfer_stats(self):
+        self._transferStats.reset()
+
+    def _send_once(self, method, path, body, reqHeaders):
+        # Returns (resp, tempbytes, error, sent) where sent tells whether the
+        # request may have reached the appliance before ``error`` happened.
+        while True:
+            conn, reused = self._pool.acquire()
+            sent = False
             try:
-                conn = self.get_connection()
-                conn.request(method, path, body, self._headers)
+                self._prepare_connection(conn)
+                sent = True
+                conn.request(method, path, body, reqHeaders)
                 resp = conn.getresponse()
-                try:
-                    tempbytes = resp.read()
-                    tempbody = tempbytes.decode('utf-8')
-                except UnicodeDecodeError:  # Might be binary data
-                    tempbody = tempbytes
-                    conn.close()
-                    bConnected = True
-                    return resp, tempbody
-                if tempbody:
-                    try:
-                        body = json.loads(tempbody)
-                    except ValueError:
-                        body = tempbody
-                conn.close()
-                bConnected = True
-            except http.client.BadStatusLine:
-                print('Bad Status Line. Trying again...')
-                conn.close()
-                time.sleep(1)
+                tempbytes = self._read_body(resp)
+            except Exception as e:
+                self._pool.release(conn, reusable=False)
+                if reused and _is_stale_connection_error(e):
+                    # Not the appliance's fault; try again on a new socket
+                    continue
+                self._record_attempt(error=e)
+                return None, None, e, sent
+            self._pool.release(conn)
+            self._record_attempt(status=resp.status)
+            return resp, tempbytes, None, True
+
+    def do_http(self, method, path, body, headers=None):
+        resp, tempbytes = self._request(method, path, body, headers)
+        return resp, _decode_body(tempbytes, body)
+
+    def _request(self, method, path, body, headers=None):
+        # do_http without decoding the body: returns (resp, tempbytes)
+        if method != 'GET' and self._etagCache is not None:
+            self._etagCache.invalidate(path)
+        reqHeaders = self._request_headers(headers)
+        policy = self._retryPolicy
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            governor = self._governor
+            if governor is not None:
+                governor.acquire(method)
+            try:
+                resp, tempbytes, error, sent = self._send_once(
+                    method, path, body, reqHeaders)
+            finally:
+                if governor is not None:
+                    governor.release(method)
+            if error is not None:
+                _raise_if_deadline_passed(error)
+                delay = policy.delay(attempt)
+                if not (policy.can_retry(attempt) and
+                        policy.retry_on_error(method, error, sent) and
+                        _deadline_allows(delay)):
+                    raise error
+                time.sleep(delay)
+                continue
+            if (resp.status == 401 and not reauthenticated and
+                    'auth' in reqHeaders and path != uri['loginSessions'] and
+                    self._relogin(reqHeaders['auth'])):
+                # The appliance rejected the expired session without acting
+                # on the request, so it is sent again with the new one
+                reauthenticated = True
+                attempt -= 1
+                reqHeaders = self._request_headers(headers)
                 continue
-        return resp, body
+            if (policy.can_retry(attempt) and
+                    policy.retry_on_status(method, resp.status)):
+                delay = policy.delay(attempt, resp)
+                if _deadline_allows(delay):
+                    time.sleep(delay)
+                    continue
+            return resp, tempbytes
+
+    def _open_connection(self):
+        return self.get_connection()
+
+    def get_ssl_context(self):
+        """ Return the SSLContext used for all connections to the appliance.
+
+        The context, and the trusted bundle loaded into it, is built once and
+        reused until set_trusted_ssl_bundle changes the trust settings.
+        """
+        return self._ssl_state()[0]
+
+    def _ssl_state(self):
+        with self._sslLock:
+            if self._sslContext is None:
+                self._sslContext = _make_ssl_context(self._sslTrustAll,
+                                                     self._sslTrustedBundle)
+                self._tlsSessions = _TLSSessionCache()
+            return self._sslContext, self._tlsSessions
 
     def get_connection(self):
-        context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
-        if self._sslTrustAll is False:
-            context.verify_mode = ssl.CERT_REQUIRED
-            context.load_verify_locations(self._sslTrustedBundle)
-            if self._doProxy is False:
-                conn = http.client.HTTPSConnection(self._host,
-                                                   context=context)
-            else:
-                conn = http.client.HTTPSConnection(self._proxyHost,
-                                                   self._proxyPort,
-                                                   context=context)
-                conn.set_tunnel(self._host, 443)
+        """ Build a new, unpooled connection to the appliance."""
+        context, tlsSessions = self._ssl_state()
+        if self._doProxy is False:
+            conn = _HTTPSConnection(self._host, context=context,
+                                    tlsSessions=tlsSessions)
         else:
-            context.verify_mode = ssl.CERT_NONE
-            if self._doProxy is False:
-                conn = http.client.HTTPSConnection(self._host,
-                                                   context=context)
-            else:
-                conn = http.client.HTTPSConnection(self._proxyHost,
-                                                   self._proxyPort,
-                                                   context=context)
-                conn.set_tunnel(self._host, 443)
+            conn = _HTTPSConnection(self._proxyHost, self._proxyPort,
+                                    context=context,
+                                    tlsSessions=tlsSessions)
+            conn.set_tunnel(self._host, 443)
         return conn
 
     def encode_multipart_formdata(self, fields, files, baseName, verbose=False):
         """
+        Deprecated: post_multipart streams the file with MultipartFileEncoder
+        and no longer needs this encoded copy on disk.
+
         fields is a sequence of (name, value) elements for regular form fields.
         files is a sequence of (name, filename, value) elements for data
         to be uploaded as files
@@ -196,8 +956,8 @@ class connection(object):
         return content_type
 
 
-    def patch(self, uri, body):
-        resp, body = self.do_http('PATCH', uri, json.dumps(body))
+    def patch(self, uri, body, headers=None):
+        resp, body = self.do_http('PATCH', uri, codec.dumps(body), headers)
         if resp.status >= 400:
             raise HPOneViewException(body)
         elif resp.status == 202:
@@ -206,53 +966,150 @@ class connection(object):
         return None, body
 
 
-    def post_multipart(self, uri, fields, files, baseName, verbose=False):
-        content_type = self.encode_multipart_formdata(fields, files, baseName,
-                                                      verbose)
-        inputfile = open(files + '.b64', 'rb')
-        mappedfile = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+    def post_multipart(self, uri, fields, files, baseName, verbose=False,
+                       chunkSize=_STREAM_CHUNK_SIZE, maxRate=None,
+                       progress=None, verify=True):
+        """ Upload a file as multipart/form-data, streaming it from disk.
+
+        Args:
+            uri:
+                URI to POST the file to.
+            fields:
+                Unused; kept for compatibility.
+            files:
+                Path of the file to upload.
+            baseName:
+                File name reported to the appliance.
+            verbose:
+                Print the upload progress.
+            chunkSize, maxRate, progress, verify:
+                See upload.
+
+        Returns: (response, body)
+        """
         if verbose is True:
             print(('Uploading ' + files + '...'))
-        conn = self.get_connection()
-        # conn.set_debuglevel(1)
-        conn.connect()
-        conn.putrequest('POST', uri)
-        conn.putheader('uploadfilename', baseName)
-        conn.putheader('auth', self._headers['auth'])
-        conn.putheader('Content-Type', content_type)
-        totalSize = os.path.getsize(files + '.b64')
-        conn.putheader('Content-Length', totalSize)
-        conn.endheaders()
-        while mappedfile.tell() < mappedfile.size():
-            # Send 1MB at a time
-            # NOTE: Be careful raising this value as the read chunk
-            # is stored in RAM
-            readSize = 1048576
-            conn.send(mappedfile.read(readSize))
-            if verbose is True:
-                print('%d bytes sent... \r' % mappedfile.tell())
-        mappedfile.close()
-        inputfile.close()
-        os.remove(files + '.b64')
-        response = conn.getresponse()
-        body = response.read().decode('utf-8')
-        if body:
+            callback = progress
+
+            def progress(meter):
+                print('%d bytes sent... \r' % meter.transferred)
+                if callback is not None:
+                    callback(meter)
+        return self.upload(uri, files, baseName, chunkSize=chunkSize,
+                           maxRate=maxRate, progress=progress, verify=verify)
+
+    def upload(self, uri, path, baseName=None, chunkSize=_STREAM_CHUNK_SIZE,
+               maxRate=None, progress=None, verify=True):
+        """ POST a file as multipart/form-data.
+
+        When the transfer fails before the whole body was sent, the appliance
+        cannot have acted on it, so the upload is started again according
+        to the connection RetryPolicy. The appliance does not accept partial
+        uploads, so every attempt sends the whole file; before each new
+        attempt the file is checked against the checksum taken while it was
+        first sent.
+
+        Args:
+            uri:
+                URI to POST the file to.
+            path:
+                Path of the file to upload.
+            baseName:
+                File name reported to the appliance, defaults to the base
+                name of path.
+            chunkSize:
+                Size in bytes of the writes to the connection.
+            maxRate:
+                Optional bandwidth cap in bytes per second.
+            progress:
+                Optional callback called with a TransferProgress (bytes sent,
+                rate and ETA) after each chunk and once the upload completes.
+            verify:
+                Hash the file as it is sent, so a retry never sends a
+                modified file. The file is read again only before a retry.
+
+        Returns: (response, body)
+        """
+        if baseName is None:
+            baseName = os.path.basename(path)
+        encoder = MultipartFileEncoder(path, baseName, checksum=verify)
+        meter = TransferProgress(encoder.content_length, progress)
+        bucket = TokenBucket(maxRate, chunkSize) if maxRate else None
+        policy = self._retryPolicy
+        attempt = 0
+        if self._governor is not None:
+            self._governor.acquire('POST')
+        try:
+            while True:
+                attempt += 1
+                response, body, error, sent = self._upload_once(
+                    uri, encoder, chunkSize, bucket, meter)
+                if error is not None:
+                    _raise_if_deadline_passed(error)
+                    delay = policy.delay(attempt)
+                    if (not policy.can_retry(attempt) or
+                            not policy.retry_on_error('POST', error, sent) or
+                            not _deadline_allows(delay)):
+                        raise error
+                elif not (policy.can_retry(attempt) and
+                          policy.retry_on_status('POST', response.status)):
+                    break
+                else:
+                    delay = policy.delay(attempt, response)
+                    if not _deadline_allows(delay):
+                        break
+                time.sleep(delay)
+                encoder.verify()
+        finally:
+            if self._governor is not None:
+                self._governor.release('POST')
+        meter.finish()
+        return response, _decode_body(body, '')
+
+    def _upload_once(self, uri, encoder, chunkSize, bucket, meter):
+        # Send one attempt of upload; returns (response, body, error, sent)
+        # like _send_once, sent telling whether the whole body went out
+        while True:
+            conn, reused = self._pool.acquire()
+            sent = False
             try:
-                body = json.loads(body)
-            except ValueError:
-                body = response.read().decode('utf-8')
-        conn.close()
-        return response, body
+                # conn.set_debuglevel(1)
+                self._prepare_connection(conn)
+                conn.putrequest('POST', uri)
+                conn.putheader('uploadfilename', encoder.baseName)
+                conn.putheader('auth', self._headers['auth'])
+                conn.putheader('Content-Type', encoder.content_type)
+                conn.putheader('Content-Length', encoder.content_length)
+                conn.endheaders()
+                meter.restart()
+                for chunk in encoder.iter_chunks(chunkSize):
+                    if bucket is not None:
+                        bucket.acquire(len(chunk))
+                    conn.send(chunk)
+                    meter.update(len(chunk))
+                sent = True
+                response = conn.getresponse()
+                body = self._read_body(response)
+            except Exception as e:
+                self._pool.release(conn, reusable=False)
+                if not sent and reused and _is_stale_connection_error(e):
+                    continue
+                self._record_attempt(error=e)
+                return None, None, e, sent
+            self._pool.release(conn, reusable=not response.will_close)
+            self._record_attempt(status=response.status)
+            return response, body, None, True
 
     ###########################################################################
     # Utility functions for making requests - the HTTP verbs
     ###########################################################################
-    def get(self, uri):
-        resp, body = self.do_http('GET', uri, '')
-        if resp.status >= 400:
-            raise HPOneViewException(body)
-        if resp.status == 302:
-            body = self.get(resp.getheader('Location'))
+    def get(self, uri, headers=None):
+        """ GET a resource and return its decoded body.
+
+        Concurrent GETs of the same URI with the same headers share a single
+        request; every caller but the first gets its own copy of the body.
+        """
+        body = self._fetch(uri, headers)
         if type(body) is dict:
             if 'nextPageUri' in body:
                 self._nextPage = body['nextPageUri']
@@ -264,6 +1121,378 @@ class connection(object):
                 self._numDisplayedRecords = body['count']
         return body
 
+    def _timed_fetch(self, uri, headers=None):
+        # _fetch, also returning the seconds taken and the bytes decoded
+        state = self._pageState
+        state.responseBytes = 0
+        started = time.time()
+        body = self._fetch(uri, headers)
+        return body, time.time() - started, state.responseBytes
+
+    def _fetch(self, uri, headers=None):
+        # GET without touching the pagination state of the thread
+        key = (uri, tuple(sorted(self._request_headers(headers).items())))
+        if self._singleFlight is None:
+            return self._get(uri, headers, key)
+        return self._singleFlight.do(key,
+                                     lambda: self._get(uri, headers, key))
+
+    def _get(self, uri, headers, key):
+        cache = self._etagCache
+        if cache is None:
+            resp, body = self.do_http('GET', uri, '', headers)
+            tempbytes = None
+        else:
+            reqHeaders = headers
+            cached = cache.lookup(key)
+            if cached is not None:
+                reqHeaders = dict(headers or {})
+                reqHeaders['If-None-Match'] = cached[0]
+            resp, tempbytes = self._request('GET', uri, '', reqHeaders)
+            if resp.status == 304 and cached is not None:
+                cache.count(True)
+                return _decode_body(cached[1], '')
+            body = _decode_body(tempbytes, '')
+        if resp.status >= 400:
+            raise HPOneViewException(body)
+        if resp.status == 302:
+            location = resp.getheader('Location')
+            body = self._get(location, headers, (location,) + key[1:])
+        elif cache is not None:
+            cache.count(False)
+            etag = resp.getheader('ETag')
+            if etag is None and type(body) is dict:
+                etag = body.get('eTag')
+            if etag:
+                cache.store(key, etag, tempbytes)
+        return body
+
+    def _open_response(self, method, path, body, reqHeaders):
+        # Send a request and return (conn, resp) with the body still unread;
+        # the caller must release conn once it is done with the response.
+        while True:
+            conn, reused = self._pool.acquire()
+            try:
+                self._prepare_connection(conn)
+                conn.request(method, path, body, reqHeaders)
+                resp = conn.getresponse()
+            except Exception as e:
+                self._pool.release(conn, reusable=False)
+                if reused and _is_stale_connection_error(e):
+                    continue
+                self._record_attempt(error=e)
+                raise
+            self._record_attempt(status=resp.status)
+            return conn, resp
+
+    def get_stream(self, uri, chunkSize=_STREAM_CHUNK_SIZE, headers=None,
+                   meter=None):
+        """ GET a resource as a stream of byte chunks of up to chunkSize.
+
+        The body is never held in memory as a whole, which makes this the
+        method of choice for backups, support dumps and other downloads.
+        The pooled connection is held until the generator is exhausted or
+        closed.
+
+        Args:
+            uri:
+                URI of the resource to download.
+            chunkSize:
+                Maximum size in bytes of each chunk yielded.
+            headers:
+                Additional request headers.
+            meter:
+                Optional TransferProgress updated as chunks arrive.
+        """
+        overlay = {'Accept-Encoding': 'identity'}
+        overlay.update(headers or {})
+        reqHeaders = self._request_headers(overlay)
+        governor = self._governor
+        if governor is not None:
+            governor.acquire('GET')
+        try:
+            conn, resp = self._open_stream(uri, reqHeaders)
+            for data in self._iter_body(conn, resp, chunkSize, meter):
+                yield data
+        finally:
+            if governor is not None:
+                governor.release('GET')
+
+    def _open_stream(self, uri, reqHeaders):
+        # Send the GET of get_stream, retrying and following redirects, and
+        # return (conn, resp) with the 2xx body still unread
+        attempt = 0
+        redirects = 0
+        while True:
+            attempt += 1
+            try:
+                conn, resp = self._open_response('GET', uri, '', reqHeaders)
+            except Exception as e:
+                self._stream_retry(attempt, error=e)
+                continue
+            if resp.status < 300:
+                return conn, resp
+            try:
+                body = _decode_body(self._read_body(resp), '')
+            finally:
+                self._pool.release(conn)
+            location = resp.getheader('Location')
+            if resp.status in _REDIRECT_STATUSES and location and \
+                    redirects < _MAX_REDIRECTS:
+                redirects += 1
+                uri = location
+            elif resp.status >= 400:
+                self._stream_retry(attempt, resp=resp, body=body)
+            else:
+                # Not modified, or a redirect chain that does not end
+                raise HPOneViewException('response: %s\n%s' %
+                                         (resp.status, body))
+
+    def _stream_retry(self, attempt, error=None, resp=None, body=None):
+        # Sleep before another attempt of _open_stream, or raise the error
+        policy = self._retryPolicy
+        if error is not None:
+            _raise_if_deadline_passed(error)
+            delay = policy.delay(attempt)
+            retry = policy.retry_on_error('GET', error)
+        else:
+            delay = policy.delay(attempt, resp)
+            retry = policy.retry_on_status('GET', resp.status)
+        if not (retry and policy.can_retry(attempt) and
+                _deadline_allows(delay)):
+            if error is not None:
+                raise error
+            raise HPOneViewException(body)
+        time.sleep(delay)
+
+    def _iter_body(self, conn, resp, chunkSize, meter):
+        # Yield the decoded body of resp and give conn back to the pool
+        if meter is not None:
+            length = resp.getheader('Content-Length')
+            if length is not None and meter.total is None:
+                meter.total = int(length)
+        decoder = _ContentDecoder(resp.getheader('Content-Encoding'))
+        wireBytes = 0
+        decodedBytes = 0
+        try:
+            while True:
+                data = resp.read(chunkSize)
+                if not data:
+                    break
+                wireBytes += len(data)
+                if meter is not None:
+                    meter.update(len(data))
+                data = decoder.decompress(data)
+                decodedBytes += len(data)
+                if data:
+                    yield data
+            data = decoder.flush()
+            decodedBytes += len(data)
+            if data:
+                yield data
+        except BaseException:
+            # Includes the consumer closing the generator early
+            self._pool.release(conn, reusable=False)
+            raise
+        self._pool.release(conn)
+        self._transferStats.record(wireBytes, decodedBytes, decoder.encoding)
+
+    def download(self, uri, dest, chunkSize=_STREAM_CHUNK_SIZE, progress=None):
+        """ Stream a resource straight into a file.
+
+        Args:
+            uri:
+                URI of the resource to download.
+            dest:
+                File name, or a file object opened for binary writing.
+            chunkSize:
+                Size in bytes of the reads from the appliance.
+            progress:
+                Optional callback called with a TransferProgress after each
+                chunk and once the download completes.
+
+        Returns: TransferProgress with the bytes written, the elapsed time
+        and the average rate in bytes per second.
+        """
+        meter = TransferProgress(callback=progress)
+        if hasattr(dest, 'write'):
+            fout = dest
+        else:
+            fout = open(dest, 'wb')
+        try:
+            for chunk in self.get_stream(uri, chunkSize, meter=meter):
+                fout.write(chunk)
+        finally:
+            if fout is not dest:
+                fout.close()
+        meter.finish()
+        return meter
+
+    def iter_members(self, uri, page_size=None, headers=None, prefetch=0,
+                     fields=None):
+        """ Generate the members of a collection, one page at a time.
+
+        Pages are requested as the generator is consumed, following the
+        nextPageUri of each page, so memory use stays flat and the first
+        members are available after a single round trip. The pagination
+        state used by getNextPage is left alone.
+
+        Args:
+            uri:
+                Collection URI, possibly with a query string (filter, sort).
+                Any start or count in it is replaced.
+            page_size:
+                Members requested per page. If None the page sizer of
+                the connection picks it, and adjusts it from page to page
+                (see set_page_sizer).
+            headers:
+                Optional extra request headers.
+            prefetch:
+                Number of pages to fetch concurrently once the first page
+                has given the collection total. Members are still
+                generated in order. 0 reads the pages one after another.
+            fields:
+                Optional list of member attributes to keep, dotted for
+                nested ones. They are requested with the fields= parameter
+                and every page is cut down to them as soon as it is
+                decoded (see query.project), so the members generated are
+                small dicts even when the appliance ignores the parameter.
+        """
+        if fields:
+            uri = Query().fields(*fields).uri(uri)
+        size = self._page_size(uri, page_size)
+        pageUri = page_uri(uri, 0, size)
+        if prefetch:
+            for member in self._prefetch_members(uri, pageUri, headers,
+                                                 prefetch, fields=fields):
+                yield member
+            return
+        start = 0
+        while pageUri:
+            body, elapsed, nbytes = self._timed_fetch(pageUri, headers)
+            members = _page_members(body, fields)
+            nextUri = body.get('nextPageUri') if members else None
+            self._observe_page(uri, pageUri, len(members), elapsed, nbytes)
+            if page_size is None and nextUri and nextUri != pageUri:
+                # Continue where this page ended, at the size now advised
+                start += len(members)
+                size = self._page_size(uri, None)
+                nextUri = page_uri(uri, start, size)
+            del body
+            for member in members:
+                yield member
+            if nextUri == pageUri:
+                break
+            pageUri = nextUri
+
+    def _page_size(self, uri, page_size):
+        if page_size:
+            return page_size
+        if self._pageSizer is not None:
+            return self._pageSizer.size(uri)
+        return DEFAULT_PAGE_SIZE
+
+    def _observe_page(self, uri, pageUri, received, elapsed, nbytes):
+        # Let the page sizer learn from every page read
+        if self._pageSizer is not None:
+            requested = split_page_uri(pageUri)[2]
+            self._pageSizer.observe(uri, requested, received, elapsed,
+                                    nbytes)
+
+    def _prefetch_members(self, uri, firstUri, headers, workers, first=None,
+                          fields=None, elapsed=0.0, nbytes=0):
+        if first is None:
+            first, elapsed, nbytes = self._timed_fetch(firstUri, headers)
+        members = _page_members(first, fields)
+        self._observe_page(uri, firstUri, len(members), elapsed, nbytes)
+        for member in members:
+            yield member
+        total = first.get('total') if type(first) is dict else None
+        if not members or not total or len(members) >= total:
+            return
+        # The appliance may return fewer members than requested per page,
+        # so the page actually returned sets the stride of the offsets
+        step = len(members)
+        offsets = iter(range(step, total, step))
+        pending = collections.deque()
+
+        def submit():
+            for offset in offsets:
+                fetch = _PageFetch(self, page_uri(uri, offset, step),
+                                   headers)
+                fetch.start()
+                pending.append(fetch)
+                return
+
+        for i in range(max(1, workers)):
+            submit()
+        while pending:
+            fetch = pending.popleft()
+            page = fetch.result()
+            submit()
+            members = _page_members(page, fields)
+            del page
+            self._observe_page(uri, fetch._uri, len(members), fetch.elapsed,
+                               fetch.nbytes)
+            for member in members:
+                yield member
+
+    def get_page_members(self, uri, fields=None):
+        """ GET one page of a collection, as get does, and return its
+        members. With ``fields`` they are requested and projected as by
+        iter_members."""
+        if fields:
+            uri = Query().fields(*fields).uri(uri)
+        return _page_members(self.get(uri), fields)
+
+    def get_all_members(self, uri, page_size=None, prefetch=4, fields=None):
+        """ Return every member of a collection, fetching up to
+        ``prefetch`` pages concurrently (see iter_members)."""
+        return list(self.iter_members(uri, page_size, prefetch=prefetch,
+                                      fields=fields))
+
+    def get_collection(self, uri, page_size=None, prefetch=4, fields=None):
+        """ GET a whole collection as a single collection body.
+
+        The pages are fetched as by get_all_members and merged into the
+        first one, so callers see the same dict as an unpaged GET.
+        """
+        if fields:
+            uri = Query().fields(*fields).uri(uri)
+        firstUri = page_uri(uri, 0, self._page_size(uri, page_size))
+        first, elapsed, nbytes = self._timed_fetch(firstUri)
+        if type(first) is not dict:
+            return first
+        members = list(self._prefetch_members(uri, firstUri, None, prefetch,
+                                              first, fields, elapsed, nbytes))
+        body = dict(first)
+        body.update({'members': members, 'start': 0, 'count': len(members),
+                     'nextPageUri': None})
+        return body
+
+    def open_cursor(self, uri, page_size=None):
+        """ Return a PageCursor on the first page of a collection."""
+        return PageCursor(uri, 0, page_size or DEFAULT_PAGE_SIZE)
+
+    def get_page(self, cursor, headers=None):
+        """ Read the page a PageCursor points to.
+
+        Returns (members, nextCursor), where nextCursor knows the collection
+        total and is None after the last page. Save nextCursor (to_json) as
+        a checkpoint to resume the scan from there later.
+        """
+        body = self._fetch(cursor.page_uri, headers)
+        members = get_members(body)
+        total = cursor.total
+        if type(body) is dict and body.get('total') is not None:
+            total = body['total']
+        here = PageCursor(cursor.uri, cursor.start, cursor.count, total)
+        nextCursor = here.next() if members else None
+        if nextCursor is not None and total is None and \
+                not body.get('nextPageUri'):
+            nextCursor = None
+        return members, nextCursor
+
     def getNextPage(self):
         body = self.get(self._nextPage)
         return get_members(body)
@@ -273,17 +1502,27 @@ class connection(object):
         return get_members(body)
 
     def getLastPage(self):
+        if self._nextPage is not None and self._numTotalRecords:
+            # Jump straight to the last offset instead of walking the pages
+            cursor = PageCursor.from_uri(
+                self._nextPage, self._numTotalRecords,
+                self._numDisplayedRecords or DEFAULT_PAGE_SIZE)
+            return get_members(self.get(cursor.last().page_uri))
         while self._nextPage is not None:
             members = self.getNextPage()
         return members
 
     def getFirstPage(self):
-        while self._prevPage is not None:
-            members = self.getPrevPage()
-        return members
+        if self._prevPage is None:
+            return None
+        # Jump straight to offset 0 instead of walking back page by page
+        cursor = PageCursor.from_uri(
+            self._prevPage, self._numTotalRecords,
+            self._numDisplayedRecords or DEFAULT_PAGE_SIZE)
+        return get_members(self.get(cursor.first().page_uri))
 
-    def put(self, uri, body):
-        resp, body = self.do_http('PUT', uri, json.dumps(body))
+    def put(self, uri, body, headers=None):
+        resp, body = self.do_http('PUT', uri, codec.dumps(body), headers)
         if resp.status >= 400:
             raise HPOneViewException(body)
         elif resp.status == 202:
@@ -291,8 +1530,8 @@ class connection(object):
             return task, body
         return None, body
 
-    def post(self, uri, body):
-        resp, body = self.do_http('POST', uri, json.dumps(body))
+    def post(self, uri, body, headers=None):
+        resp, body = self.do_http('POST', uri, codec.dumps(body), headers)
         if resp.status >= 400:
             raise HPOneViewException('response: %s\n%s' % (resp.status, body))
         elif resp.status == 202:
@@ -302,16 +1541,14 @@ class connection(object):
 
 
     def get_entities_byrange(self, uri, field, xmin, xmax, count=-1):
-        new_uri = uri + '?filter="\'' + field + '\'%20>%20\'' + xmin \
-            + '\'"&filter="\'' + field + '\'%20<%20\'' + xmax \
-            + '\'"&start=0&count=' + str(count)
+        new_uri = Query(gt(field, xmin), lt(field, xmax)).start(0) \
+            .count(count).uri(uri)
         body = self.get(new_uri)
         return get_members(body)
 
 
     def get_entities_byfield(self, uri, field, value, count=-1):
-        new_uri = uri + '?start=0&count=' + str(count) \
-            + '&filter=' + field + '=\'' + value + '\''
+        new_uri = Query(eq(field, value)).start(0).count(count).uri(uri)
         try:
             body = self.get(new_uri)
         except:
@@ -321,8 +1558,7 @@ class connection(object):
 
 
     def get_entity_byfield(self, uri, field, value, count=-1):
-        new_uri = uri + '?filter="\'' + field + '\'%20=%20\'' + value \
-            + '\'"&start=0&count=' + str(count)
+        new_uri = Query(eq(field, value)).start(0).count(count).uri(uri)
 
         try:
             body = self.get(new_uri)
@@ -352,8 +1588,8 @@ class connection(object):
                 raise e
         return entity
 
-    def delete(self, uri):
-        resp, body = self.do_http('DELETE', uri, '')
+    def delete(self, uri, headers=None):
+        resp, body = self.do_http('DELETE', uri, '', headers)
         if resp.status >= 400 and resp.status != 404:
             raise HPOneViewException(body)
         elif resp.status == 202:
@@ -385,18 +1621,39 @@ class connection(object):
     # Login/Logout to/from appliance
     ###########################################################################
     def login(self, cred, verbose=False):
-        if self._validateVersion is False:
+        cache = self._sessionCache
+        if cache is not None:
+            auth, versionChecked = cache.lookup(self._host, cred,
+                                                self._apiVersion)
+            if versionChecked:
+                self._validateVersion = True
+            if auth is not None:
+                # Reuse the session; a 401 later triggers a fresh login
+                self._cred = cred
+                cache.store(self._host, cred, auth)
+                self._update_headers(add={'auth': auth})
+                self._session = True
+                if verbose is True:
+                    print(('Session Key: ' + auth))
+                return
+
+        checkVersion = self._validateVersion is False
+        if checkVersion:
             self.validateVersion()
 
         self._cred = cred
         try:
-            task, body = self.post(uri['loginSessions'], self._cred)
+            task, body = self.post(uri['loginSessions'], self._cred,
+                                   headers={'auth': None})
         except HPOneViewException:
             raise
         auth = body['sessionID']
         # Add the auth ID to the headers dictionary
-        self._headers['auth'] = auth
+        self._update_headers(add={'auth': auth})
         self._session = True
+        if cache is not None:
+            cache.store(self._host, cred, auth,
+                        self._apiVersion if checkVersion else None)
         if verbose is True:
             print(('Session Key: ' + auth))
 
@@ -409,6 +1666,8 @@ class connection(object):
             raise
         if verbose is True:
             print('Logged Out')
-        del self._headers['auth']
+        if self._sessionCache is not None and self._cred is not None:
+            self._sessionCache.forget(self._host, self._cred)
+        self._update_headers(remove=['auth'])
         self._session = False
         return None
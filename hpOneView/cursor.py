@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+"""
+cursor.py
+~~~~~~~~~~~~
+
+This module implements explicit, serializable positions in paged
+collections
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'cursor'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import json
+import threading
+
+# Members requested per page when no page size is given
+DEFAULT_PAGE_SIZE = 500
+
+
+def split_page_uri(uri):
+    """ Split a collection URI into (uri, start, count), where the returned
+    uri has no start or count parameter and missing values are None."""
+    path, sep, query = uri.partition('?')
+    params = []
+    start = count = None
+    for param in query.split('&'):
+        if param.startswith('start='):
+            start = int(param[6:])
+        elif param.startswith('count='):
+            count = int(param[6:])
+        elif param:
+            params.append(param)
+    if params:
+        path = path + '?' + '&'.join(params)
+    return path, start, count
+
+
+def page_uri(uri, start, count):
+    """ Set start and count in a collection URI, keeping the rest of its
+    query string (often pre-encoded filters) untouched."""
+    path, ignored, ignored = split_page_uri(uri)
+    sep = '&' if '?' in path else '?'
+    return path + sep + 'start=%d&count=%d' % (start, count)
+
+
+class PageCursor(object):
+    """ Position of one page in a collection.
+
+    A cursor does not depend on any connection state, so several
+    collections can be read at once. It can be saved with to_json and
+    restored with from_json, to resume a scan after a crash, and can be
+    moved to any offset without reading the pages before it. Read the page
+    it points to with connection.get_page.
+
+    Args:
+        uri:
+            Collection URI, possibly with a filter or sort query.
+        start:
+            Offset of the first member of the page.
+        count:
+            Number of members per page.
+        total:
+            Number of members in the collection, once known.
+    """
+
+    def __init__(self, uri, start=0, count=DEFAULT_PAGE_SIZE, total=None):
+        self.uri, ignored, ignored = split_page_uri(uri)
+        self.start = start
+        self.count = count
+        self.total = total
+
+    @classmethod
+    def from_uri(cls, uri, total=None, count=DEFAULT_PAGE_SIZE):
+        """ Build the cursor of a page URI such as a nextPageUri."""
+        base, start, pageCount = split_page_uri(uri)
+        return cls(base, start or 0, pageCount or count, total)
+
+    @property
+    def page_uri(self):
+        return page_uri(self.uri, self.start, self.count)
+
+    def seek(self, start):
+        """ Return a cursor on the page starting at ``start``."""
+        return PageCursor(self.uri, max(0, start), self.count, self.total)
+
+    def first(self):
+        return self.seek(0)
+
+    def last(self):
+        """ Return a cursor on the last page; the total must be known."""
+        if self.total is None:
+            raise ValueError('The collection total is not known yet')
+        return self.seek(max(0, (self.total - 1) // self.count * self.count))
+
+    def next(self):
+        """ Return a cursor on the following page, or None at the end."""
+        if self.total is not None and self.start + self.count >= self.total:
+            return None
+        return self.seek(self.start + self.count)
+
+    def prev(self):
+        """ Return a cursor on the preceding page, or None at the start."""
+        if self.start == 0:
+            return None
+        return self.seek(self.start - self.count)
+
+    def to_dict(self):
+        return {'uri': self.uri, 'start': self.start, 'count': self.count,
+                'total': self.total}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['uri'], state.get('start', 0),
+                   state.get('count', DEFAULT_PAGE_SIZE), state.get('total'))
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.from_dict(json.loads(data))
+
+    def __eq__(self, other):
+        return (isinstance(other, PageCursor) and
+                self.to_dict() == other.to_dict())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'PageCursor(%r, start=%d, count=%d, total=%r)' % (
+            self.uri, self.start, self.count, self.total)
+
+
+class PageSizer(object):
+    """ Learns, per collection, how many members to request per page.
+
+    Small pages cost a round trip each, large ones take the appliance
+    seconds to build and the client megabytes to decode. After every full
+    page the sizer updates moving averages of the time and of the response
+    bytes per member, and picks the page size that should take about
+    ``targetLatency`` seconds without exceeding ``maxBytes``. The size at
+    most doubles or halves per page, within [minSize, maxSize].
+
+    Sizes are learned per collection path, ignoring the query string, and
+    kept for the life of the sizer, so later reads of the same collection
+    start at the learned size. connection.iter_members uses the sizer of
+    the connection whenever no page_size is given.
+
+    Args:
+        targetLatency:
+            Seconds one page should take to arrive.
+        maxBytes:
+            Upper bound on the decoded size of one page.
+        minSize, maxSize:
+            Bounds of the page size.
+        initialSize:
+            Page size used for a collection not read before.
+        smoothing:
+            Weight of the newest page in the moving averages, 0 to 1.
+    """
+
+    def __init__(self, targetLatency=1.0, maxBytes=4194304, minSize=25,
+                 maxSize=5000, initialSize=DEFAULT_PAGE_SIZE, smoothing=0.3):
+        self.targetLatency = targetLatency
+        self.maxBytes = maxBytes
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.initialSize = initialSize
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    @staticmethod
+    def key(uri):
+        return uri.partition('?')[0]
+
+    def size(self, uri):
+        """ Page size to request next from the collection at ``uri``."""
+        with self._lock:
+            state = self._collections.get(self.key(uri))
+            return state['pageSize'] if state else self.initialSize
+
+    def _average(self, old, new):
+        if old is None:
+            return new
+        return old + self.smoothing * (new - old)
+
+    def observe(self, uri, requested, received, elapsed, nbytes=0):
+        """ Record one page read and return the next page size.
+
+        Args:
+            uri:
+                Collection URI the page came from.
+            requested:
+                The count asked for.
+            received:
+                Members actually returned.
+            elapsed:
+                Seconds the request took.
+            nbytes:
+                Decoded response bytes, 0 if unknown (a cached reply).
+        """
+        with self._lock:
+            state = self._collections.setdefault(self.key(uri), {
+                'pageSize': self.initialSize, 'pages': 0, 'members': 0,
+                'avgLatency': None, 'avgBytes': None,
+                'memberTime': None, 'memberBytes': None})
+            state['pages'] += 1
+            state['members'] += received
+            state['avgLatency'] = self._average(state['avgLatency'], elapsed)
+            if nbytes:
+                state['avgBytes'] = self._average(state['avgBytes'], nbytes)
+            # A short page (the last one, or a capped count) mostly measures
+            # the fixed cost of a request, which would shrink the size
+            if not received or received < requested:
+                return state['pageSize']
+            state['memberTime'] = self._average(state['memberTime'],
+                                                elapsed / received)
+            if nbytes:
+                state['memberBytes'] = self._average(state['memberBytes'],
+                                                     nbytes / received)
+            ideal = self.targetLatency / max(state['memberTime'], 1e-6)
+            if state['memberBytes']:
+                ideal = min(ideal, self.maxBytes / state['memberBytes'])
+            ideal = max(received // 2, min(received * 2, int(ideal)))
+            state['pageSize'] = max(self.minSize, min(self.maxSize, ideal))
+            return state['pageSize']
+
+    def reset(self, uri=None):
+        """ Forget what was learned about ``uri``, or about everything."""
+        with self._lock:
+            if uri is None:
+                self._collections.clear()
+            else:
+                self._collections.pop(self.key(uri), None)
+
+    def get_stats(self):
+        """ Return, per collection path, the current 'pageSize', the
+        'pages' and 'members' read, the moving averages of the page
+        latency in seconds ('avgLatency') and size in bytes ('avgBytes'),
+        and the per member estimates ('memberTime', 'memberBytes')."""
+        with self._lock:
+            return dict((key, dict(state))
+                        for key, state in self._collections.items())
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+deadline.py
+~~~~~~~~~~~~
+
+This module implements deadlines bounding how long a sequence of calls to
+the appliance may take
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'deadline'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import threading
+import time
+
+from hpOneView.exceptions import HPOneViewTimeout
+
+_local = threading.local()
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+class deadline(object):
+    """ Bound the time taken by every call made in a with block.
+
+    Connections use the time left as socket timeout and stop retrying once
+    it is spent, and activity.wait4task stops polling, so a high level call
+    such as servers.create_server_profile (POST, task polling and final
+    GET) is bounded as a whole. Deadlines apply to the current thread; a
+    nested deadline can shorten but never extend the enclosing one.
+
+    Args:
+        seconds:
+            Time budget for the block.
+
+    Example:
+        with hpov.deadline(900):
+            srv.create_server_profile(...)
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = None
+
+    def __enter__(self):
+        self.expires = time.time() + self.seconds
+        outer = current_deadline()
+        if outer is not None:
+            self.expires = min(self.expires, outer.expires)
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _stack().remove(self)
+        return False
+
+    def remaining(self):
+        return max(0.0, self.expires - time.time())
+
+    def expired(self):
+        return time.time() >= self.expires
+
+    def check(self, what='Operation'):
+        if self.expired():
+            raise HPOneViewTimeout('%s exceeded the %s second deadline'
+                                   % (what, self.seconds))
+
+
+def current_deadline():
+    """ Return the innermost active deadline of this thread, or None."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def remaining_time(limit=None):
+    """ Return the smaller of ``limit`` and the time left before the current
+    deadline, or None when neither is set."""
+    active = current_deadline()
+    if active is None:
+        return limit
+    if limit is None:
+        return active.remaining()
+    return min(limit, active.remaining())
+
+
+def check_deadline(what='Operation'):
+    """ Raise HPOneViewTimeout if the current deadline has passed."""
+    active = current_deadline()
+    if active is not None:
+        active.check(what)
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -64,3 +64,11 @@ class HPOneViewUnknownType(HPOneViewException):
 
 class HPOneViewTimeout(HPOneViewException):
     pass
+
+
+class HPOneViewTransferError(HPOneViewException):
+    pass
+
+
+class HPOneViewCircuitOpen(HPOneViewException):
+    pass
@@ -58,14 +58,23 @@ class facilities(object):
         body = self._con.get(uri['datacenters'])
         return body
 
+    def iter_datacenters(self, page_size=None):
+        return self._con.iter_members(uri['datacenters'], page_size)
+
     def get_powerdevices(self):
         body = self._con.get(uri['powerDevices'])
         return body
 
+    def iter_powerdevices(self, page_size=None):
+        return self._con.iter_members(uri['powerDevices'], page_size)
+
     def get_racks(self):
         body = self._con.get(uri['racks'])
         return body
 
+    def iter_racks(self, page_size=None):
+        return self._con.iter_members(uri['racks'], page_size)
+
     def delete_datacenter(self, datacenter, force=False, blocking=True,
                           verbose=False):
         if force:
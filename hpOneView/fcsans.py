@@ -58,14 +58,23 @@ class fcsans(object):
         body = self._con.get(uri['device-managers'])
         return body
 
+    def iter_device_managers(self, page_size=None):
+        return self._con.iter_members(uri['device-managers'], page_size)
+
     def get_managed_sans(self):
         body = self._con.get(uri['managed-sans'])
         return body
 
+    def iter_managed_sans(self, page_size=None):
+        return self._con.iter_members(uri['managed-sans'], page_size)
+
     def get_providers(self):
         body = get_members(self._con.get(uri['providers']))
         return body
 
+    def iter_providers(self, page_size=None):
+        return self._con.iter_members(uri['providers'], page_size)
+
     def remove_device_manager(self, manager, blocking=True, verbose=False):
         task, body = self._con.delete(manager['uri'])
         if blocking is True:
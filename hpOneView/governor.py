@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""
+governor.py
+~~~~~~~~~~~~
+
+This module implements client side rate limiting and concurrency control of
+the requests sent to an appliance
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'governor'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import threading
+import time
+
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+class TokenBucket(object):
+    """ Thread-safe token bucket allowing ``rate`` requests per second with
+    bursts of up to ``burst`` requests."""
+
+    def __init__(self, rate, burst=None):
+        self._rate = float(rate)
+        self._capacity = float(burst if burst is not None else max(1, rate))
+        self._tokens = self._capacity
+        self._stamp = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """ Take tokens, returning how many seconds to wait before using them.
+
+        Tokens may be borrowed ahead of time, so concurrent callers are
+        handed successive slots rather than all waking up at once.
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self._capacity,
+                               self._tokens + (now - self._stamp) * self._rate)
+            self._stamp = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Lane(object):
+    """Limits and metrics for one class of requests (reads or writes)."""
+
+    def __init__(self, rate, burst, concurrency):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = concurrency
+        self.inFlight = 0
+        self.cond = threading.Condition()
+        self.stats = {'requests': 0, 'waitTime': 0.0, 'maxWait': 0.0,
+                      'inFlight': 0, 'peakInFlight': 0}
+
+    def acquire(self):
+        start = time.time()
+        if self.bucket is not None:
+            self.bucket.acquire()
+        with self.cond:
+            while self.concurrency and self.inFlight >= self.concurrency:
+                self.cond.wait()
+            self._enter(time.time() - start)
+
+    def _enter(self, waited):
+        self.inFlight += 1
+        self.stats['requests'] += 1
+        self.stats['waitTime'] += waited
+        self.stats['maxWait'] = max(self.stats['maxWait'], waited)
+        self.stats['inFlight'] = self.inFlight
+        self.stats['peakInFlight'] = max(self.stats['peakInFlight'],
+                                         self.inFlight)
+
+    def try_enter(self, waited):
+        with self.cond:
+            if self.concurrency and self.inFlight >= self.concurrency:
+                return False
+            self._enter(waited)
+            return True
+
+    def release(self):
+        with self.cond:
+            self.inFlight -= 1
+            self.stats['inFlight'] = self.inFlight
+            self.cond.notify()
+
+    def snapshot(self):
+        with self.cond:
+            stats = dict(self.stats)
+        stats['avgWait'] = (stats['waitTime'] / stats['requests']
+                            if stats['requests'] else 0.0)
+        return stats
+
+
+class RequestGovernor(object):
+    """ Caps the request rate and the number of in-flight requests sent to
+    one appliance, separately for reads and for mutating calls.
+
+    Attach a governor with connection.set_governor; share the same instance
+    between every connection talking to the same appliance so the limits
+    apply to all of them together.
+
+    Args:
+        readRate:
+            Maximum GET/HEAD/OPTIONS requests per second, or None.
+        writeRate:
+            Maximum POST/PUT/PATCH/DELETE requests per second, or None.
+        readConcurrency:
+            Maximum reads in flight at once, or None.
+        writeConcurrency:
+            Maximum mutating requests in flight at once, or None.
+        burst:
+            Requests allowed back to back before the rate applies. Defaults
+            to one second worth of requests.
+    """
+
+    def __init__(self, readRate=None, writeRate=None, readConcurrency=None,
+                 writeConcurrency=None, burst=None):
+        self._lanes = {'read': _Lane(readRate, burst, readConcurrency),
+                       'write': _Lane(writeRate, burst, writeConcurrency)}
+
+    def _lane(self, method):
+        if method.upper() in READ_METHODS:
+            return self._lanes['read']
+        return self._lanes['write']
+
+    def acquire(self, method):
+        """ Block until a request using ``method`` may be sent."""
+        self._lane(method).acquire()
+
+    def release(self, method):
+        self._lane(method).release()
+
+    def slot(self, method):
+        """ Context manager holding a request slot for ``method``."""
+        return _Slot(self, method)
+
+    def reserve(self, method):
+        """ Non-blocking half of acquire for event loops: returns the
+        seconds to wait for a rate token. Follow it with try_enter."""
+        lane = self._lane(method)
+        return lane.bucket.reserve() if lane.bucket is not None else 0.0
+
+    def try_enter(self, method, waited=0.0):
+        """ Take an in-flight slot if one is free, without blocking."""
+        return self._lane(method).try_enter(waited)
+
+    def get_stats(self):
+        """ Return per lane ('read' and 'write') request counts, queue
+        wait times in seconds ('waitTime', 'avgWait', 'maxWait') and the
+        current and peak number of in-flight requests."""
+        return dict((name, lane.snapshot())
+                    for name, lane in self._lanes.items())
+
+
+class _Slot(object):
+
+    def __init__(self, governor, method):
+        self._governor = governor
+        self._method = method
+
+    def __enter__(self):
+        self._governor.acquire(self._method)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._governor.release(self._method)
+        return False
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -100,6 +100,9 @@ class networking(object):
     def get_ligs(self):
         return get_members(self._con.get(uri['lig']))
 
+    def iter_ligs(self, page_size=None):
+        return self._con.iter_members(uri['lig'], page_size)
+
     def get_lig_by_name(self, ligname):
         return self._con.get_entity_byfield(uri['lig'], 'name', ligname)
 
@@ -116,6 +119,9 @@ class networking(object):
         resp = get_members(self._con.get(uri['ictype']))
         return resp
 
+    def iter_interconnect_types(self, page_size=None):
+        return self._con.iter_members(uri['ictype'], page_size)
+
     ###########################################################################
     # Logical Interconnects
     ###########################################################################
@@ -141,6 +147,9 @@ class networking(object):
         """
         return get_members(self._con.get(uri['li'] + filter))
 
+    def iter_lis(self, filter='', page_size=None):
+        return self._con.iter_members(uri['li'] + filter, page_size)
+
     def correct_lis(self, uris, blocking=True, verbose=False):
         """ Returns logical interconnects to a consistent state.
 
@@ -266,6 +275,9 @@ class networking(object):
     def get_connection_templates(self):
         return get_members(self._con.get(uri['ct']))
 
+    def iter_connection_templates(self, page_size=None):
+        return self._con.iter_members(uri['ct'], page_size)
+
     def update_net_ctvalues(self, xnet, bw={}):
         if not bw:
             return
@@ -328,6 +340,9 @@ class networking(object):
     def get_networksets(self):
         return get_members(self._con.get(uri['nset']))
 
+    def iter_networksets(self, page_size=None):
+        return self._con.iter_members(uri['nset'], page_size)
+
     ###########################################################################
     # Networks
     ###########################################################################
@@ -494,11 +509,20 @@ class networking(object):
             task = self._activity.wait4task(task, verbose=verbose)
         return task
 
-    def get_enet_networks(self):
-        return get_members(self._con.get(uri['enet']))
+    def get_enet_networks(self, fields=None):
+        """ Return the first page of Ethernet networks. With ``fields``,
+        e.g. ['name', 'uri', 'vlanId'], each network only has those
+        attributes (see connection.get_page_members)."""
+        return self._con.get_page_members(uri['enet'], fields)
 
-    def get_fc_networks(self):
-        return get_members(self._con.get(uri['fcnet']))
+    def iter_enet_networks(self, page_size=None, fields=None):
+        return self._con.iter_members(uri['enet'], page_size, fields=fields)
+
+    def get_fc_networks(self, fields=None):
+        return self._con.get_page_members(uri['fcnet'], fields)
+
+    def iter_fc_networks(self, page_size=None, fields=None):
+        return self._con.iter_members(uri['fcnet'], page_size, fields=fields)
 
     ###########################################################################
     # Uplink Sets
@@ -506,6 +530,9 @@ class networking(object):
     def get_uplink_sets(self):
         return get_members(self._con.get(uri['uplink-sets']))
 
+    def iter_uplink_sets(self, page_size=None):
+        return self._con.iter_members(uri['uplink-sets'], page_size)
+
     def delete_uplink_set(self, uplink_set, blocking=True, verbose=False):
         task, body = self._con.delete(uplink_set['uri'])
         if blocking is True:
@@ -538,6 +565,9 @@ class networking(object):
         downlinks_uri = uri['ld'] + filter
         return self._con.get(downlinks_uri)
 
+    def iter_logical_downlinks(self, filter='', page_size=None):
+        return self._con.iter_members(uri['ld'] + filter, page_size)
+
     def get_logical_downlinks_schema(self):
         """ Gets the JSON schema for the logical downlink.
 
@@ -596,6 +626,9 @@ class networking(object):
     def get_interconnects(self):
         return get_members(self._con.get(uri['ic']))
 
+    def iter_interconnects(self, page_size=None):
+        return self._con.iter_members(uri['ic'], page_size)
+
     def get_enet_network_by_name(self, nwname):
         return self._con.get_entity_byfield(uri['enet'], 'name', nwname)
 
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+"""
+query.py
+~~~~~~~~~~~~
+
+This module implements a builder for the filter, query, sort, start and
+count parameters of collection requests
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from builtins import str
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'query'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+from urllib.parse import quote
+
+# Characters left as is in parameter values, everything else is escaped
+_SAFE = "'=/:,()*"
+
+# Operators in filter= and in query= syntax
+_OPERATORS = {
+    'eq': ('=', ' EQ '),
+    'ne': ('!=', ' NE '),
+    'lt': ('<', ' LT '),
+    'le': ('<=', ' LE '),
+    'gt': ('>', ' GT '),
+    'ge': ('>=', ' GE '),
+    'matches': (' matches ', ' MATCHES '),
+}
+
+
+def _literal(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _encode(value):
+    return quote(value.encode('utf-8'), safe=_SAFE)
+
+
+class Condition(object):
+    """ A comparison, or conditions joined with AND or OR.
+
+    Build conditions with eq, ne, lt, le, gt, ge, matches, between, in_,
+    and_ and or_; the & and | operators work as and_ and or_.
+    """
+
+    def __init__(self, op, field=None, value=None, children=()):
+        self.op = op
+        self.field = field
+        self.value = value
+        self.children = tuple(children)
+
+    def compile(self, syntax='filter'):
+        """ Return the expression in 'filter' or 'query' syntax."""
+        if self.op in ('AND', 'OR'):
+            parts = [c.compile(syntax) for c in self.children]
+            if len(parts) == 1:
+                return parts[0]
+            return '(' + (' %s ' % self.op).join(parts) + ')'
+        operator = _OPERATORS[self.op][0 if syntax == 'filter' else 1]
+        return self.field + operator + _literal(self.value)
+
+    def __and__(self, other):
+        return and_(self, other)
+
+    def __or__(self, other):
+        return or_(self, other)
+
+    def __repr__(self):
+        return 'Condition(%r)' % self.compile()
+
+
+def eq(field, value):
+    return Condition('eq', field, value)
+
+
+def ne(field, value):
+    return Condition('ne', field, value)
+
+
+def lt(field, value):
+    return Condition('lt', field, value)
+
+
+def le(field, value):
+    return Condition('le', field, value)
+
+
+def gt(field, value):
+    return Condition('gt', field, value)
+
+
+def ge(field, value):
+    return Condition('ge', field, value)
+
+
+def matches(field, pattern):
+    """ Match ``pattern``, where % stands for any characters."""
+    return Condition('matches', field, pattern)
+
+
+def between(field, low, high):
+    """ low <= field <= high"""
+    return and_(ge(field, low), le(field, high))
+
+
+def in_(field, values):
+    """ field equal to any of ``values``."""
+    return or_(*[eq(field, value) for value in values])
+
+
+def and_(*conditions):
+    return Condition('AND', children=conditions)
+
+
+def or_(*conditions):
+    return Condition('OR', children=conditions)
+
+
+def _conjuncts(conditions):
+    for condition in conditions:
+        if condition.op == 'AND':
+            for child in _conjuncts(condition.children):
+                yield child
+        else:
+            yield condition
+
+
+class Query(object):
+    """ Parameters of a collection request.
+
+    Example:
+        q = Query(eq('name', 'Encl1'), gt('created', '2016-01-01'))
+        con.get(q.sort('name').count(100).uri(uri['enclosures']))
+
+    Conditions passed to the constructor or to where are ANDed. They are
+    sent as filter= parameters by default, one per top level condition,
+    or as a single query= parameter when ``syntax`` is 'query'. All values
+    are URL encoded.
+
+    Args:
+        conditions:
+            Conditions the members must meet.
+        syntax:
+            'filter' or 'query'.
+    """
+
+    def __init__(self, *conditions, **kwargs):
+        self._conditions = list(conditions)
+        self._syntax = kwargs.get('syntax', 'filter')
+        self._sort = []
+        self._start = None
+        self._count = None
+        self._fields = []
+
+    def where(self, *conditions):
+        self._conditions.extend(conditions)
+        return self
+
+    def sort(self, field, order='asc'):
+        self._sort.append(field + ':' + order)
+        return self
+
+    def start(self, start):
+        self._start = start
+        return self
+
+    def count(self, count):
+        self._count = count
+        return self
+
+    def fields(self, *names):
+        """ Ask for only these member attributes (see project)."""
+        self._fields.extend(names)
+        return self
+
+    def params(self):
+        """ Return the encoded (name, value) pairs of the query."""
+        params = []
+        if self._syntax == 'query':
+            if self._conditions:
+                expr = and_(*self._conditions).compile('query')
+                params.append(('query', _encode('"' + expr + '"')))
+        else:
+            # The appliance ANDs repeated filter parameters, so top level
+            # conjunctions are split rather than sent as one expression
+            for condition in _conjuncts(self._conditions):
+                expr = condition.compile('filter')
+                params.append(('filter', _encode('"' + expr + '"')))
+        if self._sort:
+            params.append(('sort', _encode(','.join(self._sort))))
+        if self._fields:
+            params.append(('fields', _encode(','.join(self._fields))))
+        if self._start is not None:
+            params.append(('start', str(self._start)))
+        if self._count is not None:
+            params.append(('count', str(self._count)))
+        return params
+
+    def to_query_string(self):
+        return '&'.join(name + '=' + value for name, value in self.params())
+
+    def uri(self, base):
+        """ Append the query to a collection URI."""
+        qs = self.to_query_string()
+        if not qs:
+            return base
+        return base + ('&' if '?' in base else '?') + qs
+
+    def __str__(self):
+        return self.to_query_string()
+
+
+def project(member, fields):
+    """ Return a compact copy of ``member`` holding only ``fields``.
+
+    Dotted names select nested attributes, e.g. 'status' or
+    'firmware.firmwareBaselineUri', and come back nested the same way.
+    Missing attributes are left out. Applied to every member of a page as
+    soon as it is decoded, so appliances that ignore the fields= parameter
+    still only leave the requested attributes in memory.
+    """
+    if type(member) is not dict:
+        return member
+    record = {}
+    for name in fields:
+        parts = name.split('.')
+        value = member
+        for part in parts:
+            if type(value) is not dict or part not in value:
+                break
+            value = value[part]
+        else:
+            target = record
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return record
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+retry.py
+~~~~~~~~~~~~
+
+This module implements the retry policy applied to requests sent to the
+appliance
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'retry'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import email.utils
+import http.client
+import random
+import socket
+import ssl
+import time
+
+
+class RetryPolicy(object):
+    """ Decides whether, and after how long, a failed request is sent again.
+
+    Args:
+        maxAttempts:
+            Total number of attempts for one request, including the first.
+            Use 1 to disable retries.
+        backoffFactor:
+            Base delay in seconds; attempt n waits up to
+            backoffFactor * 2 ** (n - 1) seconds.
+        maxBackoff:
+            Upper bound in seconds for the exponential delay.
+        jitter:
+            When True the delay is drawn uniformly between zero and the
+            exponential value ("full jitter"), which keeps many clients
+            backing off from the same appliance from retrying in lockstep.
+        retryStatuses:
+            HTTP statuses that are worth retrying for idempotent requests.
+        rejectedStatuses:
+            Subset of statuses meaning the appliance refused the request
+            without acting on it, so any request, including a POST, may
+            safely be sent again.
+        idempotentMethods:
+            Methods that may be replayed after the request could have reached
+            the appliance (a reset connection, a timeout or a 502/504).
+        respectRetryAfter:
+            Wait at least as long as the Retry-After response header asks,
+            bounded by maxRetryAfter seconds.
+    """
+
+    def __init__(self, maxAttempts=5, backoffFactor=0.5, maxBackoff=30,
+                 jitter=True, retryStatuses=(429, 502, 503, 504),
+                 rejectedStatuses=(429, 503),
+                 idempotentMethods=('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'),
+                 respectRetryAfter=True, maxRetryAfter=120):
+        self.maxAttempts = maxAttempts
+        self.backoffFactor = backoffFactor
+        self.maxBackoff = maxBackoff
+        self.jitter = jitter
+        self.retryStatuses = frozenset(retryStatuses)
+        self.rejectedStatuses = frozenset(rejectedStatuses)
+        self.idempotentMethods = frozenset(m.upper() for m in idempotentMethods)
+        self.respectRetryAfter = respectRetryAfter
+        self.maxRetryAfter = maxRetryAfter
+
+    def is_idempotent(self, method):
+        return method.upper() in self.idempotentMethods
+
+    def can_retry(self, attempt):
+        return attempt < self.maxAttempts
+
+    def retry_on_error(self, method, error, sent=True):
+        """ Return True if an exception raised by an attempt is retryable.
+
+        ``sent`` is False when the error happened while connecting, before
+        any part of the request was written, in which case every method is
+        safe to retry.
+        """
+        if isinstance(error, (ssl.SSLError, ssl.CertificateError)):
+            # Handshake and certificate failures do not fix themselves
+            return False
+        if not isinstance(error, (http.client.HTTPException, socket.error)):
+            return False
+        return not sent or self.is_idempotent(method)
+
+    def retry_on_status(self, method, status):
+        if status in self.rejectedStatuses:
+            return True
+        return status in self.retryStatuses and self.is_idempotent(method)
+
+    def backoff(self, attempt):
+        delay = min(self.maxBackoff, self.backoffFactor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def retry_after(self, resp):
+        """ Seconds requested by a Retry-After header, or None."""
+        if resp is None or not self.respectRetryAfter:
+            return None
+        value = resp.getheader('Retry-After')
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            seconds = int(value)
+        else:
+            parsed = email.utils.parsedate_tz(value)
+            if parsed is None:
+                return None
+            seconds = email.utils.mktime_tz(parsed) - time.time()
+        return min(max(seconds, 0), self.maxRetryAfter)
+
+    def delay(self, attempt, resp=None):
+        """ Seconds to wait before the attempt following ``attempt``."""
+        delay = self.backoff(attempt)
+        requested = self.retry_after(resp)
+        if requested is not None:
+            delay = max(delay, requested)
+        return delay
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
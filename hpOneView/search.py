@@ -62,9 +62,21 @@ class search(object):
                 sQuery = sQuery + key + '=' + query[key] + '&'
         else:
             sQuery = query
+        if not is_paged_query(sQuery):
+            return self._con.get_all_members(uri['resource'] + '?' + sQuery)
         body = self._con.get(uri['resource'] + '?' + sQuery)
         return get_members(body)
 
+    def iter_resources(self, query='', page_size=None):
+        if type(query) is dict:
+            sQuery = ''
+            for key in query:
+                sQuery = sQuery + key + '=' + query[key] + '&'
+        else:
+            sQuery = query
+        return self._con.iter_members(uri['resource'] + '?' + sQuery,
+                                      page_size)
+
     def get_associations(self, query=''):
         if type(query) is dict:
             sQuery = ''
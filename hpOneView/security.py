@@ -60,6 +60,9 @@ class security(object):
         body = self._con.get(uri['users'])
         return get_members(body)
 
+    def iter_users(self, page_size=None):
+        return self._con.iter_members(uri['users'], page_size)
+
     def get_user(self, user):
         body = self._con.get(uri['users'] + '/' + user)
         return body
@@ -104,6 +107,12 @@ class security(object):
         body = self._con.get(uri['roles'])
         return get_members(body)
 
+    def iter_roles(self, page_size=None):
+        return self._con.iter_members(uri['roles'], page_size)
+
+    def get_role_by_name(self, name):
+        return self._con.get_entity_byfield(uri['roles'], 'roleName', name)
+
     ###########################################################################
     # Certificates
     ###########################################################################
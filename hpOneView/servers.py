@@ -58,16 +58,10 @@ class servers(object):
     # Server Hardware
     ###########################################################################
     def get_server_by_bay(self, baynum):
-        servers = get_members(self._con.get(uri['servers']))
-        for server in servers:
-            if server['position'] == baynum:
-                return server
+        return self._con.get_entity_byfield(uri['servers'], 'position', baynum)
 
     def get_server_by_name(self, name):
-        servers = get_members(self._con.get(uri['servers']))
-        for server in servers:
-            if server['name'] == name:
-                return server
+        return self._con.get_entity_byfield(uri['servers'], 'name', name)
 
     def get_available_servers(self, server_hardware_type=None,
                               enclosure_group=None, server_profile=None):
@@ -85,13 +79,23 @@ class servers(object):
 
         return self._con.get(uri['profile-available-targets'] + query_string)
 
-    def get_servers(self):
-        return get_members(self._con.get(uri['servers']))
+    def get_servers(self, fields=None):
+        """ Return the first page of server hardware. With ``fields``,
+        e.g. ['name', 'uri', 'status'], each server only has those
+        attributes (see connection.get_page_members)."""
+        return self._con.get_page_members(uri['servers'], fields)
+
+    def iter_servers(self, page_size=None, fields=None):
+        return self._con.iter_members(uri['servers'], page_size,
+                                      fields=fields)
 
     def get_server_hardware_types(self):
         body = self._con.get(uri['server-hardware-types'])
         return get_members(body)
 
+    def iter_server_hardware_types(self, page_size=None):
+        return self._con.iter_members(uri['server-hardware-types'], page_size)
+
     def set_server_powerstate(self, server, state, force=False, blocking=True,
                               verbose=False):
         if state == 'Off' and force is True:
@@ -281,9 +285,12 @@ class servers(object):
             task = self._activity.wait4task(task, tout=600, verbose=verbose)
         return task
 
-    def get_server_profiles(self):
-        body = self._con.get(uri['profiles'])
-        return get_members(body)
+    def get_server_profiles(self, fields=None):
+        return self._con.get_page_members(uri['profiles'], fields)
+
+    def iter_server_profiles(self, page_size=None, fields=None):
+        return self._con.iter_members(uri['profiles'], page_size,
+                                      fields=fields)
 
     def update_server_profile(self, profile, blocking=True, verbose=False):
         task, body = self._con.put(profile['uri'], profile)
@@ -398,6 +405,9 @@ class servers(object):
         body = self._con.get(uri['profile-templates'])
         return get_members(body)
 
+    def iter_server_profile_templates(self, page_size=None):
+        return self._con.iter_members(uri['profile-templates'], page_size)
+
     def get_server_profile_template_by_name(self, name):
         body = self._con.get_entity_byfield(uri['profile-templates'], 'name', name)
         return body
@@ -419,9 +429,15 @@ class servers(object):
     ###########################################################################
     # Enclosures
     ###########################################################################
-    def get_enclosures(self):
-        body = self._con.get(uri['enclosures'])
-        return get_members(body)
+    def get_enclosures(self, fields=None):
+        return self._con.get_page_members(uri['enclosures'], fields)
+
+    def iter_enclosures(self, page_size=None, fields=None):
+        return self._con.iter_members(uri['enclosures'], page_size,
+                                      fields=fields)
+
+    def get_enclosure_by_name(self, name):
+        return self._con.get_entity_byfield(uri['enclosures'], 'name', name)
 
     def add_enclosure(self, enclosure, blocking=True, verbose=False):
         task, body = self._con.post(uri['enclosures'], enclosure)
@@ -480,6 +496,9 @@ class servers(object):
     def get_enclosure_groups(self):
         return get_members(self._con.get(uri['enclosureGroups']))
 
+    def iter_enclosure_groups(self, page_size=None):
+        return self._con.iter_members(uri['enclosureGroups'], page_size)
+
     def update_enclosure_group(self, enclosuregroup):
         task, body = self._con.put(enclosuregroup['uri'], enclosuregroup)
         return body
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+session.py
+~~~~~~~~~~~~
+
+This module implements the on-disk cache letting short lived processes
+reuse an appliance login session
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'session'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from hpOneView.exceptions import HPOneViewException
+
+# os.rename does not replace an existing file on Windows
+_replace = getattr(os, 'replace', os.rename)
+
+
+class SessionCache(object):
+    """ Keeps appliance session IDs in a private file between processes.
+
+    Entries are keyed by appliance, login domain and user name; passwords
+    are never written. The file is created with mode 0600 in a 0700
+    directory and is ignored if other users could read or change it.
+
+    Attach the cache with connection.set_session_cache before calling
+    login. login then reuses a stored session without sending any request
+    and skips the /rest/version check while it is recent. If the appliance
+    answers 401 because the session expired, the connection logs in again
+    with the same credentials and updates the file.
+
+    Args:
+        path:
+            Cache file, ~/.hpOneView/sessions.json by default.
+        sessionTTL:
+            Seconds a session is reused after it was last used.
+        versionTTL:
+            Seconds a successful /rest/version check is trusted.
+    """
+
+    def __init__(self, path=None, sessionTTL=3600, versionTTL=86400):
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.hpOneView',
+                                'sessions.json')
+        self.path = path
+        self.sessionTTL = sessionTTL
+        self.versionTTL = versionTTL
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(host, cred):
+        return '%s|%s|%s' % (host, cred.get('authLoginDomain', ''),
+                             cred.get('userName', ''))
+
+    def lookup(self, host, cred, apiVersion):
+        """ Return (sessionID, versionChecked) for the appliance and user.
+
+        sessionID is None unless a session was used within sessionTTL, and
+        versionChecked is True if /rest/version was checked for apiVersion
+        within versionTTL.
+        """
+        entry = self._read().get(self.key(host, cred), {})
+        now = time.time()
+        sessionID = entry.get('sessionID')
+        if now - entry.get('lastUsed', 0) > self.sessionTTL:
+            sessionID = None
+        versionChecked = (entry.get('apiVersion') == apiVersion and
+                          now - entry.get('versionChecked', 0) <
+                          self.versionTTL)
+        return sessionID, versionChecked
+
+    def store(self, host, cred, sessionID, apiVersion=None):
+        """ Record a session, and a successful version check if apiVersion
+        is given."""
+        key = self.key(host, cred)
+        with self._lock:
+            entries = self._read()
+            entry = entries.get(key, {})
+            entry['sessionID'] = sessionID
+            entry['lastUsed'] = time.time()
+            if apiVersion is not None:
+                entry['apiVersion'] = apiVersion
+                entry['versionChecked'] = entry['lastUsed']
+            entries[key] = entry
+            self._write(entries)
+
+    def forget(self, host, cred):
+        """ Drop the session stored for the appliance and user."""
+        key = self.key(host, cred)
+        with self._lock:
+            entries = self._read()
+            if key in entries:
+                entries[key].pop('sessionID', None)
+                self._write(entries)
+
+    def _read(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return {}
+        with os.fdopen(fd, 'rb') as fin:
+            info = os.fstat(fin.fileno())
+            if hasattr(os, 'getuid') and (
+                    info.st_uid != os.getuid() or
+                    info.st_mode & (stat.S_IRWXG | stat.S_IRWXO)):
+                raise HPOneViewException('Session cache ' + self.path +
+                                         ' is accessible by other users')
+            try:
+                return json.loads(fin.read().decode('utf-8'))
+            except ValueError:
+                return {}
+
+    def _write(self, entries):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        # mkstemp creates the file with mode 0600; rename replaces the
+        # cache atomically so concurrent processes never read half of it
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.sessions')
+        try:
+            with os.fdopen(fd, 'wb') as fout:
+                fout.write(json.dumps(entries).encode('utf-8'))
+            _replace(tmp, self.path)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
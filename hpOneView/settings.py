@@ -10,7 +10,6 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import division
 from __future__ import absolute_import
-from builtins import open
 from future import standard_library
 standard_library.install_aliases()
 
@@ -58,9 +57,13 @@ class settings(object):
     ###########################################################################
     # Appliance Firmware
     ###########################################################################
-    def upload_fw(self, path, name, verbose=False):
+    def upload_fw(self, path, name, verbose=False, maxRate=None,
+                  progress=None, verify=True):
         response, body = self._con.post_multipart(uri['appliance-firmware'],
-                                                  '', path, name, verbose)
+                                                  '', path, name, verbose,
+                                                  maxRate=maxRate,
+                                                  progress=progress,
+                                                  verify=verify)
         if response.status >= 400:
             raise HPOneViewException(body)
         return body
@@ -80,9 +83,13 @@ class settings(object):
     ###########################################################################
     # SPP Upload
     ###########################################################################
-    def upload_spp(self, sppPath, sppName, verbose=False, blocking=True):
+    def upload_spp(self, sppPath, sppName, verbose=False, blocking=True,
+                   maxRate=None, progress=None, verify=True):
         response, body = self._con.post_multipart(uri['fwUpload'], '',
-                                                  sppPath, sppName, verbose)
+                                                  sppPath, sppName, verbose,
+                                                  maxRate=maxRate,
+                                                  progress=progress,
+                                                  verify=verify)
         if response.status >= 400:
             raise HPOneViewException(body)
         if response.status == 202 and verbose is True:
@@ -102,6 +109,9 @@ class settings(object):
         body = self._con.get(uri['fwDrivers'])
         return get_members(body)
 
+    def iter_spps(self, page_size=None):
+        return self._con.iter_members(uri['fwDrivers'], page_size)
+
     def get_health_status(self):
         body = self._con.get(uri['healthStatus'])
         return get_members(body)
@@ -123,11 +133,9 @@ class settings(object):
                 request)
         return body
 
-    def download_support_dump(self, dumpInfo):
-        body = self._con.get(dumpInfo['uri'])
-        f = open(dumpInfo['uri'].split('/')[-1], 'wb')
-        f.write(body)
-        f.close()
+    def download_support_dump(self, dumpInfo, progress=None):
+        self._con.download(dumpInfo['uri'], dumpInfo['uri'].split('/')[-1],
+                           progress=progress)
         return
 
     def generate_backup(self, blocking=True, verbose=False):
@@ -142,16 +150,19 @@ class settings(object):
         backup = self._con.get(backupResource['resourceUri'])
         return backup
 
-    def download_backup(self, backup):
-        body = self._con.get(backup['downloadUri'])
-        f = open(backup['downloadUri'].split('/')[-1] + '.bkp', 'wb')
-        f.write(body)
-        f.close()
+    def download_backup(self, backup, progress=None):
+        self._con.download(backup['downloadUri'],
+                           backup['downloadUri'].split('/')[-1] + '.bkp',
+                           progress=progress)
         return
 
-    def upload_backup(self, path, name, verbose=False, blocking=True):
+    def upload_backup(self, path, name, verbose=False, blocking=True,
+                      maxRate=None, progress=None, verify=True):
         response, body = self._con.post_multipart(uri['archive'], '',
-                                                  path, name, verbose)
+                                                  path, name, verbose,
+                                                  maxRate=maxRate,
+                                                  progress=progress,
+                                                  verify=verify)
         if response.status >= 400:
             raise HPOneViewException(body)
         if response.status == 202 and verbose is True:
@@ -174,6 +185,9 @@ class settings(object):
         body = self._con.get(uri['backups'])
         return body
 
+    def iter_backups(self, page_size=None):
+        return self._con.iter_members(uri['backups'], page_size)
+
     def get_restores(self):
         body = self._con.get(uri['restores'])
         return body
@@ -191,6 +205,9 @@ class settings(object):
         body = self._con.get(uri['licenses'])
         return get_members(body)
 
+    def iter_licenses(self, page_size=None):
+        return self._con.iter_members(uri['licenses'], page_size)
+
     def add_license(self, licenseKey):
         request = {
             'key': licenseKey,
@@ -82,10 +82,23 @@ class storage(object):
         body = get_members(self._con.get(uri['storage-systems']))
         return body
 
+    def iter_storage_systems(self, page_size=None):
+        return self._con.iter_members(uri['storage-systems'], page_size)
+
+    def get_storage_system_by_name(self, name):
+        return self._con.get_entity_byfield(uri['storage-systems'], 'name',
+                                            name)
+
     def get_storage_pools(self):
         body = self._con.get(uri['storage-pools'])
         return body
 
+    def iter_storage_pools(self, page_size=None):
+        return self._con.iter_members(uri['storage-pools'], page_size)
+
+    def get_storage_pool_by_name(self, name):
+        return self._con.get_entity_byfield(uri['storage-pools'], 'name', name)
+
     def add_storage_pool(self, name, storageSystemUri, blocking=True,
                          verbose=False):
         request = {'storageSystemUri': storageSystemUri,
@@ -99,14 +112,12 @@ class storage(object):
                 return server
         return task
 
-    # Temporarly modify the headers passed for POST and DELTE on storage volume
+    # Pass additional headers for POST and DELTE on storage volume
     # templates in order to work around a bug. Without these headers the call
     # cause a NullPointerException on the appliance and a 400 gets returned.
     def add_storage_volume_template(self, name, capacity, shareable, storagePoolUri, state='Normal',
                                     description='', provisionType='Thin', verbose=False):
-        ori_headers = self._con._headers
-        self._con._headers.update({'Accept-Language': 'en'})
-        self._con._headers.update({'Accept-Encoding': 'deflate'})
+        headers = {'Accept-Language': 'en', 'Accept-Encoding': 'deflate'}
         template = make_storage_vol_templateV3(name,
                                                capacity,
                                                shareable,
@@ -114,19 +125,16 @@ class storage(object):
                                                description,
                                                provisionType)
 
-        task, body = self._con.post(uri['vol-templates'], template)
-        self._con._headers = ori_headers
+        task, body = self._con.post(uri['vol-templates'], template, headers)
         return body
 
-    # Temporarly modify the headers passed for POST and DELTE on storage volume
+    # Pass additional headers for POST and DELTE on storage volume
     # templates in order to work around a bug. Without these headers the call
     # cause a NullPointerException on the appliance and a 400 gets returned.
     def remove_storage_volume_template(self, volTemplate, blocking=True,
                                        verbose=False):
-        ori_headers = self._con._headers
-        self._con._headers.update({'Accept-Language': 'en'})
-        task, body = self._con.delete(volTemplate['uri'])
-        self._con._headers = ori_headers
+        task, body = self._con.delete(volTemplate['uri'],
+                                      {'Accept-Language': 'en'})
         if blocking is True:
             task = self._activity.wait4task(task, tout=600, verbose=verbose)
             return body
@@ -136,10 +144,19 @@ class storage(object):
         body = self._con.get(uri['attachable-volumes'])
         return body
 
+    def iter_attachable_volumes(self, page_size=None):
+        return self._con.iter_members(uri['attachable-volumes'], page_size)
+
     def get_storage_volume_templates(self):
         body = self._con.get(uri['vol-templates'])
         return body
 
+    def iter_storage_volume_templates(self, page_size=None):
+        return self._con.iter_members(uri['vol-templates'], page_size)
+
+    def get_storage_volume_template_by_name(self, name):
+        return self._con.get_entity_byfield(uri['vol-templates'], 'name', name)
+
     def get_connectable_storage_volume_templates(self):
         body = self._con.get(uri['connectable-vol'])
         return body
@@ -172,10 +189,16 @@ class storage(object):
         ret = self.add_storage_volume(volume, blocking, verbose)
         return ret
 
-    # TODO remove the evil use/hack of the large count defaul once the
-    # OneView appliance honors -1 as a valid count vaule
     def get_storage_volumes(self):
-        body = self._con.get(uri['storage-volumes'] + '?start=0&count=999999')
+        body = self._con.get_collection(uri['storage-volumes'])
         return body
 
+    def iter_storage_volumes(self, page_size=None):
+        """ Generate the storage volumes page by page."""
+        return self._con.iter_members(uri['storage-volumes'], page_size)
+
+    def get_storage_volume_by_name(self, name):
+        return self._con.get_entity_byfield(uri['storage-volumes'], 'name',
+                                            name)
+
 # vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
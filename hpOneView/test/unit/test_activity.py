@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import unittest
+
+from hpOneView.activity import *
+from hpOneView.common import uri
+from hpOneView.connection import *
+
+
+class ActivityTest(unittest.TestCase):
+
+    def setUp(self):
+        super(ActivityTest, self).setUp()
+        self.connection = connection('1.2.3.4')
+        self.activity = activity(self.connection)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get')
+    def test_wait4tasks_polls_all_tasks_in_one_query(self, mock_get,
+                                                     mock_sleep):
+        tasks = [{'uri': '/rest/tasks/%d' % i} for i in range(3)]
+
+        def get(xuri):
+            if xuri == '/rest/tasks/2':
+                return {'uri': xuri, 'taskState': 'Completed',
+                        'percentComplete': 100, 'taskErrors': []}
+            running = mock_get.call_count == 1
+            return {'members': [
+                {'uri': '/rest/tasks/0', 'percentComplete': 50,
+                 'taskState': 'Running' if running else 'Completed'},
+                {'uri': '/rest/tasks/1', 'percentComplete': 100,
+                 'taskState': 'Error', 'taskErrors': [{'message': 'x'}]}]}
+        mock_get.side_effect = get
+
+        states = self.activity.wait4tasks(tasks, chunkSize=2)
+
+        self.assertEqual([s['taskState'] for s in states],
+                         ['Completed', 'Error', 'Completed'])
+        self.assertEqual(states[1], {'uri': '/rest/tasks/1',
+                                     'taskState': 'Error',
+                                     'percentComplete': 100})
+        self.assertEqual([c[0][0] for c in mock_get.call_args_list], [
+            uri['task'] + "?filter=%22(uri='/rest/tasks/0'%20OR%20"
+            "uri='/rest/tasks/1')%22&fields=uri,taskState,percentComplete"
+            "&start=0&count=2",
+            uri['task'] + "?filter=%22uri='/rest/tasks/2'%22"
+            "&fields=uri,taskState,percentComplete&start=0&count=1",
+            '/rest/tasks/2',
+            uri['task'] + "?filter=%22uri='/rest/tasks/0'%22"
+            "&fields=uri,taskState,percentComplete&start=0&count=1"])
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    @mock.patch.object(connection, 'get')
+    def test_wait4task_follows_progress_and_times_out(self, mock_get,
+                                                      mock_time, mock_sleep):
+        clock = [1000.0]
+        mock_time.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+        mock_sleep.side_effect = sleep
+        # A 480 s enclosure add that stops making progress at 90%
+        progress = iter([0, 10, 50, 90])
+        mock_get.side_effect = lambda xuri: {
+            'uri': xuri, 'taskState': 'Running', 'expectedDuration': 480,
+            'computedPercentComplete': next(progress, 90)}
+
+        self.assertRaises(HPOneViewTimeout, self.activity.wait4task,
+                          {'uri': '/rest/tasks/1'}, tout=300, maxInterval=60)
+        # Half the time left at the observed rate, then, once progress
+        # stalls, half of what expectedDuration leaves for the last 10%
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list],
+                         [60, 60, 37.5, 4.6875] + [24.0] * 5 + [17.8125])
+        self.assertEqual(clock[0], 1300.0)
+
+    def test_scheduler_backs_off_without_progress_information(self):
+        scheduler = TaskPollScheduler(minInterval=1, maxInterval=5)
+        task = {'taskState': 'Running'}
+        self.assertEqual([scheduler.next_interval(task) for i in range(5)],
+                         [1, 2, 4, 5, 5])
+        task = {'taskState': 'Running', 'percentComplete': 100}
+        self.assertEqual(scheduler.next_interval(task), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
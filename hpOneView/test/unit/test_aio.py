@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import asyncio
+import json
+import unittest
+
+from hpOneView.common import uri
+from hpOneView.aio import *
+from hpOneView.aio import _AsyncStream
+
+
+class FakeAppliance(object):
+    """Plain-TCP HTTP/1.1 server that answers each request with the next
+    canned (status, headers, body) response."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while self.responses:
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            headers = dict(line.split(': ', 1) for line in lines[1:] if line)
+            body = await reader.readexactly(
+                int(headers.get('Content-Length', 0)))
+            self.requests.append((lines[0], headers, body))
+            status, extra, data = self.responses.pop(0)
+            out = 'HTTP/1.1 %d X\r\n' % status
+            for name, value in extra:
+                out += '%s: %s\r\n' % (name, value)
+            writer.write(out.encode('latin-1') + b'\r\n' + data)
+            await writer.drain()
+        writer.close()
+
+
+class AsyncConnectionTest(unittest.TestCase):
+
+    def run_with_appliance(self, responses, coro_factory):
+        appliance = FakeAppliance(responses)
+
+        async def scenario():
+            server = await asyncio.start_server(appliance.handle,
+                                                '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            con = AsyncConnection('127.0.0.1')
+
+            async def open_plain_stream():
+                reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                               port)
+                return _AsyncStream(reader, writer)
+            con._pool._factory = open_plain_stream
+            try:
+                return await coro_factory(con)
+            finally:
+                con.close()
+                server.close()
+
+        result = asyncio.run(scenario())
+        return appliance, result
+
+    def json_response(self, body, status=200):
+        data = json.dumps(body).encode('utf-8')
+        return status, [('Content-Length', str(len(data)))], data
+
+    def test_get_reuses_keep_alive_stream(self):
+        responses = [self.json_response({'a': 1}),
+                     (200, [('Transfer-Encoding', 'chunked')],
+                      b'7\r\n{"b": 2\r\n1\r\n}\r\n0\r\n\r\n')]
+
+        async def scenario(con):
+            first = await con.get('/rest/a')
+            second = await con.get('/rest/b')
+            return first, second
+
+        appliance, result = self.run_with_appliance(responses, scenario)
+        self.assertEqual(result, ({'a': 1}, {'b': 2}))
+        self.assertEqual(appliance.connections, 1)
+        self.assertEqual(appliance.requests[1][0], 'GET /rest/b HTTP/1.1')
+
+    def test_post_returns_task_from_location(self):
+        task = {'uri': '/rest/tasks/1', 'taskState': 'Running'}
+        responses = [(202, [('Location', '/rest/tasks/1'),
+                            ('Content-Length', '0')], b''),
+                     self.json_response(task)]
+
+        async def scenario(con):
+            return await con.post(uri['enet'], {'name': 'net'})
+
+        appliance, result = self.run_with_appliance(responses, scenario)
+        self.assertEqual(result[0], task)
+        self.assertEqual(json.loads(appliance.requests[0][2].decode()),
+                         {'name': 'net'})
+
+    def test_server_lookup_is_a_single_filtered_get(self):
+        server = {'name': 'bay 1', 'uri': '/rest/server-hardware/1'}
+        responses = [self.json_response({'members': [server]})]
+
+        async def scenario(con):
+            return await AsyncServers(con).get_server_by_name('bay 1')
+
+        appliance, result = self.run_with_appliance(responses, scenario)
+        self.assertEqual(result, server)
+        self.assertEqual(appliance.requests[0][0],
+                         "GET " + uri['servers'] + "?filter=%22name='bay%201'"
+                         "%22&start=0&count=-1 HTTP/1.1")
+
+    def test_error_status_raises(self):
+        responses = [self.json_response({'errorCode': 'NOPE'}, 404)]
+
+        async def scenario(con):
+            return await con.get('/rest/missing')
+
+        self.assertRaises(HPOneViewException, self.run_with_appliance,
+                          responses, scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import socket
+import unittest
+
+from hpOneView.breaker import *
+from hpOneView.exceptions import HPOneViewCircuitOpen
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        super(CircuitBreakerTest, self).setUp()
+        self.events = []
+        self.breaker = CircuitBreaker(failureThreshold=3, resetTimeout=30,
+                                      name='oneview1')
+        self.breaker.add_listener(self.events.append)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertRaises(HPOneViewCircuitOpen, self.breaker.before_request)
+        self.assertEqual([(e['name'], e['previous'], e['state'])
+                          for e in self.events],
+                         [('oneview1', CLOSED, OPEN)])
+
+    @mock.patch('time.time')
+    def test_half_open_allows_a_single_probe(self, mock_time):
+        mock_time.return_value = 100.0
+        for i in range(3):
+            self.breaker.record_failure()
+        mock_time.return_value = 131.0
+
+        self.assertTrue(self.breaker.before_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertRaises(HPOneViewCircuitOpen, self.breaker.before_request)
+
+        self.breaker.probe_finished(False)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertRaises(HPOneViewCircuitOpen, self.breaker.before_request)
+
+        mock_time.return_value = 162.0
+        self.assertTrue(self.breaker.before_request())
+        self.breaker.probe_finished(True)
+        self.assertFalse(self.breaker.before_request())
+        self.assertEqual([e['state'] for e in self.events],
+                         [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED])
+
+    def test_failure_classification(self):
+        self.assertTrue(self.breaker.is_failure(error=socket.error()))
+        self.assertFalse(self.breaker.is_failure(error=ValueError()))
+        self.assertTrue(self.breaker.is_failure(status=503))
+        self.assertFalse(self.breaker.is_failure(status=404))
+
+
+if __name__ == '__main__':
+    unittest.main()
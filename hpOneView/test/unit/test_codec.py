@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import unittest
+
+from hpOneView import codec
+from hpOneView.connection import _decode_body
+
+
+class CodecTest(unittest.TestCase):
+
+    def tearDown(self):
+        codec.set_codec(None)
+
+    def test_every_available_codec_round_trips_bytes(self):
+        doc = {'name': 'profile/1', 'members': [1, 2.5, None, True],
+               'description': 'caf\u00e9'}
+        for name in codec.available_codecs():
+            c = codec.make_codec(name)
+            data = c.dumps(doc)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(c.loads(data), doc)
+
+    def test_stdlib_is_always_available(self):
+        self.assertEqual(codec.available_codecs()[-1], 'json')
+        self.assertRaises(ValueError, codec.make_codec, 'yaml')
+
+    def test_set_codec_returns_previous(self):
+        previous = codec.set_codec('json')
+        self.assertEqual(codec.get_codec().name, 'json')
+        self.assertEqual(codec.set_codec(previous).name, 'json')
+
+    def test_decode_body_falls_back_to_text_and_bytes(self):
+        codec.set_codec('json')
+        self.assertEqual(_decode_body(b'{"a": 1}', ''), {'a': 1})
+        self.assertEqual(_decode_body(b'not json', ''), 'not json')
+        self.assertEqual(_decode_body(b'\xff\xfe', ''), b'\xff\xfe')
+        self.assertEqual(_decode_body(b'', b'{"b": 2}'), '{"b": 2}')
+
+
+if __name__ == '__main__':
+    unittest.main()
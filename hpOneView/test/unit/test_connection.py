@@ -0,0 +1,821 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import copy
+import errno
+import io
+import mock
+import os
+import shutil
+import socket
+import ssl
+import threading
+import time
+import unittest
+import zlib
+import json
+import tempfile
+
+from hpOneView.breaker import CircuitBreaker
+from hpOneView.connection import *
+from hpOneView.cursor import PageCursor
+from hpOneView.cursor import PageSizer
+from hpOneView.deadline import deadline
+from hpOneView.governor import RequestGovernor
+from hpOneView.session import SessionCache
+
+
+class FakeResponse(object):
+
+    def __init__(self, status=200, body=b'', headers=None, will_close=False):
+        self.status = status
+        self._body = body
+        self._headers = headers or {}
+        self.will_close = will_close
+
+    def read(self, amt=None):
+        if amt is None:
+            data, self._body = self._body, b''
+        else:
+            data, self._body = self._body[:amt], self._body[amt:]
+        return data
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name, default)
+
+
+class FakeHTTPSConnection(object):
+
+    def __init__(self, responses):
+        self._responses = list(responses)
+        self.sock = None
+        self.requests = []
+        self.closed = False
+
+    def connect(self):
+        self.sock = mock.Mock()
+
+    def request(self, method, path, body, headers):
+        if self.sock is None:
+            self.sock = mock.Mock()
+        self.requests.append((method, path, body, dict(headers)))
+
+    def putrequest(self, method, path):
+        self.requests.append((method, path, b'', {}))
+
+    def putheader(self, name, value):
+        self.requests[-1][3][name] = value
+
+    def endheaders(self):
+        pass
+
+    def send(self, data):
+        method, path, body, headers = self.requests[-1]
+        self.requests[-1] = (method, path, body + bytes(data), headers)
+
+    def getresponse(self):
+        resp = self._responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        if resp.will_close:
+            self.sock = None
+        return resp
+
+    def close(self):
+        self.sock = None
+        self.closed = True
+
+
+class ConnectionTest(unittest.TestCase):
+
+    def setUp(self):
+        super(ConnectionTest, self).setUp()
+        self.host = '1.2.3.4'
+        self.connection = connection(self.host)
+
+    def json_response(self, body, status=200, **kwargs):
+        return FakeResponse(status, json.dumps(body).encode('utf-8'), **kwargs)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_do_http_reuses_keep_alive_connection(self, mock_get_connection):
+        conn = FakeHTTPSConnection([self.json_response({'a': 1}),
+                                    self.json_response({'b': 2})])
+        mock_get_connection.return_value = conn
+
+        resp, body = self.connection.do_http('GET', '/rest/a', '')
+        self.assertEqual(body, {'a': 1})
+        resp, body = self.connection.do_http('GET', '/rest/b', '')
+        self.assertEqual(body, {'b': 2})
+
+        mock_get_connection.assert_called_once_with()
+        self.assertEqual([r[1] for r in conn.requests], ['/rest/a', '/rest/b'])
+        self.assertFalse(conn.closed)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_do_http_discards_connection_closed_by_server(self,
+                                                          mock_get_connection):
+        first = FakeHTTPSConnection([self.json_response({}, will_close=True)])
+        second = FakeHTTPSConnection([self.json_response({})])
+        mock_get_connection.side_effect = [first, second]
+
+        self.connection.do_http('GET', '/rest/a', '')
+        self.connection.do_http('GET', '/rest/b', '')
+
+        self.assertEqual(mock_get_connection.call_count, 2)
+        self.assertTrue(first.closed)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_do_http_replaces_stale_pooled_connection(self,
+                                                      mock_get_connection):
+        reset = socket.error(errno.ECONNRESET, 'Connection reset by peer')
+        stale = FakeHTTPSConnection([self.json_response({}), reset])
+        fresh = FakeHTTPSConnection([self.json_response({'ok': True})])
+        mock_get_connection.side_effect = [stale, fresh]
+
+        self.connection.do_http('GET', '/rest/a', '')
+        resp, body = self.connection.do_http('GET', '/rest/b', '')
+
+        self.assertEqual(body, {'ok': True})
+        self.assertTrue(stale.closed)
+        self.assertEqual(fresh.requests[0][1], '/rest/b')
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_set_proxy_retires_pooled_connections(self, mock_get_connection):
+        first = FakeHTTPSConnection([self.json_response({})])
+        second = FakeHTTPSConnection([self.json_response({})])
+        mock_get_connection.side_effect = [first, second]
+
+        self.connection.do_http('GET', '/rest/a', '')
+        self.connection.set_proxy('proxy', 8080)
+        self.connection.do_http('GET', '/rest/b', '')
+
+        self.assertTrue(first.closed)
+        self.assertEqual(second.requests[0][1], '/rest/b')
+
+    def test_ssl_context_is_cached(self):
+        context = self.connection.get_ssl_context()
+        self.assertIs(self.connection.get_ssl_context(), context)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+
+    @mock.patch.object(ssl.SSLContext, 'load_verify_locations')
+    def test_trusted_bundle_rebuilds_ssl_context(self, mock_load):
+        context = self.connection.get_ssl_context()
+        self.connection.set_trusted_ssl_bundle('bundle.pem')
+        trusted = self.connection.get_ssl_context()
+        self.connection.get_ssl_context()
+
+        self.assertIsNot(trusted, context)
+        self.assertEqual(trusted.verify_mode, ssl.CERT_REQUIRED)
+        mock_load.assert_called_once_with('bundle.pem')
+
+    def test_get_connection_shares_tls_sessions(self):
+        first = self.connection.get_connection()
+        second = self.connection.get_connection()
+        self.assertIs(first._context, second._context)
+        self.assertIs(first._tlsSessions, second._tlsSessions)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_header_overlay_does_not_leak(self, mock_get_connection):
+        conn = FakeHTTPSConnection([self.json_response({}),
+                                    self.json_response({})])
+        mock_get_connection.return_value = conn
+
+        self.connection.post('/rest/a', {}, {'Accept-Language': 'en'})
+        self.connection.get('/rest/b')
+
+        self.assertEqual(conn.requests[0][3]['Accept-Language'], 'en')
+        self.assertNotIn('Accept-Language', conn.requests[1][3])
+        self.assertNotIn('Accept-Language', self.connection._headers)
+
+    @mock.patch.object(connection, 'do_http')
+    def test_pagination_state_is_per_thread(self, mock_do_http):
+        page = {'members': [], 'nextPageUri': '/rest/a?start=10',
+                'total': 20, 'count': 10}
+        mock_do_http.return_value = (FakeResponse(), page)
+        self.connection.get('/rest/a')
+
+        seen = []
+        worker = threading.Thread(
+            target=lambda: seen.append(self.connection._nextPage))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(seen, [None])
+        self.assertEqual(self.connection._nextPage, '/rest/a?start=10')
+        self.assertEqual(self.connection._numTotalRecords, 20)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_gzip_response_is_decoded(self, mock_get_connection):
+        members = {'members': [{'name': 'alert%d' % i} for i in range(500)]}
+        raw = json.dumps(members).encode('utf-8')
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        wire = compressor.compress(raw) + compressor.flush()
+        conn = FakeHTTPSConnection([
+            FakeResponse(200, wire, {'Content-Encoding': 'gzip'})])
+        mock_get_connection.return_value = conn
+
+        body = self.connection.get('/rest/alerts')
+
+        self.assertEqual(body, members)
+        self.assertIn('gzip', conn.requests[0][3]['Accept-Encoding'])
+        stats = self.connection.get_transfer_stats()
+        self.assertEqual(stats['compressedResponses'], 1)
+        self.assertEqual(stats['wireBytes'], len(wire))
+        self.assertEqual(stats['decodedBytes'], len(raw))
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_raw_deflate_response_is_decoded(self, mock_get_connection):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        wire = compressor.compress(b'{"uri": "/rest/x"}') + compressor.flush()
+        mock_get_connection.return_value = FakeHTTPSConnection([
+            FakeResponse(200, wire, {'Content-Encoding': 'deflate'})])
+
+        self.assertEqual(self.connection.get('/rest/x'), {'uri': '/rest/x'})
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_get_retries_service_unavailable(self, mock_get_connection,
+                                             mock_sleep):
+        conn = FakeHTTPSConnection([
+            FakeResponse(503, b'', {'Retry-After': '7'}),
+            self.json_response({'ok': True})])
+        mock_get_connection.return_value = conn
+
+        self.assertEqual(self.connection.get('/rest/a'), {'ok': True})
+        self.assertEqual(len(conn.requests), 2)
+        mock_sleep.assert_called_once_with(7)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_post_is_not_replayed_after_bad_gateway(self, mock_get_connection,
+                                                    mock_sleep):
+        conn = FakeHTTPSConnection([self.json_response({}, 502)])
+        mock_get_connection.return_value = conn
+
+        self.assertRaises(HPOneViewException, self.connection.post,
+                          '/rest/a', {})
+        self.assertEqual(len(conn.requests), 1)
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_retries_stop_after_max_attempts(self, mock_get_connection,
+                                             mock_sleep):
+        conn = FakeHTTPSConnection([socket.timeout('timed out')] * 2)
+        mock_get_connection.return_value = conn
+        self.connection.set_retry_policy(RetryPolicy(maxAttempts=2))
+
+        self.assertRaises(socket.timeout, self.connection.get, '/rest/a')
+        self.assertEqual(len(conn.requests), 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_governor_counts_reads_and_writes(self, mock_get_connection):
+        mock_get_connection.return_value = FakeHTTPSConnection(
+            [self.json_response({}), self.json_response({})])
+        governor = RequestGovernor(readRate=100, writeConcurrency=1)
+        self.connection.set_governor(governor)
+
+        self.connection.get('/rest/a')
+        self.connection.put('/rest/a', {})
+
+        stats = governor.get_stats()
+        self.assertEqual(stats['read']['requests'], 1)
+        self.assertEqual(stats['write']['requests'], 1)
+        self.assertEqual(stats['write']['inFlight'], 0)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_download_streams_to_file_object(self, mock_get_connection):
+        data = b'\x00\xff' * 5000
+        conn = FakeHTTPSConnection([
+            FakeResponse(200, data, {'Content-Length': str(len(data))})])
+        mock_get_connection.return_value = conn
+        updates = []
+        fout = io.BytesIO()
+
+        meter = self.connection.download('/rest/backups/archive/1', fout,
+                                         chunkSize=4096,
+                                         progress=lambda p: updates.append(
+                                             p.transferred))
+
+        self.assertEqual(fout.getvalue(), data)
+        self.assertEqual(updates, [4096, 8192, 10000, 10000])
+        self.assertEqual(meter.total, len(data))
+        self.assertEqual(conn.requests[0][3]['Accept-Encoding'], 'identity')
+        self.assertFalse(conn.closed)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_abandoned_stream_discards_connection(self, mock_get_connection):
+        conn = FakeHTTPSConnection([FakeResponse(200, b'x' * 100)])
+        mock_get_connection.return_value = conn
+
+        stream = self.connection.get_stream('/rest/a', chunkSize=10)
+        self.assertEqual(next(stream), b'x' * 10)
+        stream.close()
+
+        self.assertTrue(conn.closed)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_stream_error_status_raises(self, mock_get_connection):
+        mock_get_connection.return_value = FakeHTTPSConnection(
+            [self.json_response({'errorCode': 'RESOURCE_NOT_FOUND'}, 404)])
+
+        stream = self.connection.get_stream('/rest/a')
+        self.assertRaises(HPOneViewException, next, stream)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_stream_follows_redirects(self, mock_get_connection):
+        conn = FakeHTTPSConnection([
+            FakeResponse(307, b'', {'Location': '/files/a'}),
+            FakeResponse(200, b'data')])
+        mock_get_connection.return_value = conn
+
+        self.assertEqual(list(self.connection.get_stream('/rest/a')),
+                         [b'data'])
+        self.assertEqual([r[1] for r in conn.requests],
+                         ['/rest/a', '/files/a'])
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_stream_raises_on_other_3xx(self, mock_get_connection):
+        conn = FakeHTTPSConnection(
+            [FakeResponse(302, b'', {'Location': '/rest/a'})] * 7 +
+            [FakeResponse(304, b'')])
+        mock_get_connection.return_value = conn
+        stream = self.connection.get_stream('/rest/a')
+        self.assertRaises(HPOneViewException, next, stream)
+        self.assertEqual(len(conn.requests), 6)
+
+        self.connection.close()
+        mock_get_connection.return_value = FakeHTTPSConnection(
+            [FakeResponse(304, b'')])
+        stream = self.connection.get_stream('/rest/a')
+        self.assertRaises(HPOneViewException, next, stream)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_post_multipart_streams_without_temp_file(self,
+                                                      mock_get_connection):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'spp.iso')
+        with open(path, 'wb') as fout:
+            fout.write(b'\x01\x02' * 700000)
+        conn = FakeHTTPSConnection([self.json_response({'status': 'ok'})])
+        mock_get_connection.return_value = conn
+        self.connection._headers['auth'] = 'token'
+
+        resp, body = self.connection.post_multipart(
+            '/rest/firmware-bundles', '', path, 'spp.iso')
+
+        self.connection.encode_multipart_formdata('', path, 'spp.iso')
+        with open(path + '.b64', 'rb') as fin:
+            expected = fin.read()
+        method, uri, sent, headers = conn.requests[0]
+        self.assertEqual(body, {'status': 'ok'})
+        self.assertEqual(sent, expected)
+        self.assertEqual(headers['Content-Length'], len(expected))
+        self.assertEqual(sorted(os.listdir(tmpdir)), ['spp.iso', 'spp.iso.b64'])
+
+    @mock.patch('hpOneView.transfer.file_checksum')
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_upload_restarts_after_interrupted_send(self, mock_get_connection,
+                                                    mock_sleep, mock_checksum):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'spp.iso')
+        with open(path, 'wb') as fout:
+            fout.write(b'x' * 3000)
+        broken = FakeHTTPSConnection([])
+        broken.send = mock.Mock(side_effect=socket.error(errno.ETIMEDOUT,
+                                                         'timed out'))
+        conn = FakeHTTPSConnection([self.json_response({'status': 'ok'})])
+        mock_get_connection.side_effect = [broken, conn]
+        self.connection._headers['auth'] = 'token'
+        updates = []
+
+        resp, body = self.connection.upload('/rest/firmware-bundles', path,
+                                            chunkSize=1000,
+                                            progress=lambda p: updates.append(
+                                                (p.transferred, p.total)))
+
+        length = len(conn.requests[0][2])
+        self.assertEqual(body, {'status': 'ok'})
+        self.assertEqual(conn.requests[0][3]['uploadfilename'], 'spp.iso')
+        self.assertEqual(updates[-1], (length, length))
+        self.assertEqual(mock_sleep.call_count, 1)
+        # Nothing was fully sent before the retry, so the file is only read
+        # by the sends themselves
+        self.assertFalse(mock_checksum.called)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_upload_refuses_to_resend_modified_file(self, mock_get_connection,
+                                                    mock_sleep):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'spp.iso')
+        with open(path, 'wb') as fout:
+            fout.write(b'x' * 3000)
+
+        def modify(seconds):
+            with open(path, 'wb') as fout:
+                fout.write(b'y' * 3000)
+        mock_sleep.side_effect = modify
+        mock_get_connection.return_value = FakeHTTPSConnection(
+            [self.json_response({}, 503)])
+        self.connection._headers['auth'] = 'token'
+
+        self.assertRaises(HPOneViewTransferError, self.connection.upload,
+                          '/rest/firmware-bundles', path)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_timeouts_are_bounded_by_deadline(self, mock_get_connection):
+        conn = FakeHTTPSConnection([self.json_response({}),
+                                    self.json_response({})])
+        mock_get_connection.return_value = conn
+        self.connection.set_timeouts(connect=5, read=120)
+
+        self.connection.get('/rest/a')
+        self.assertEqual(conn.timeout, 5)
+        conn.sock.settimeout.assert_called_with(120)
+
+        with deadline(30):
+            self.connection.get('/rest/a')
+        self.assertLessEqual(conn.sock.settimeout.call_args[0][0], 30)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(connection, 'get_connection')
+    def test_no_retry_past_deadline(self, mock_get_connection, mock_sleep):
+        conn = FakeHTTPSConnection([socket.timeout('timed out')])
+        mock_get_connection.return_value = conn
+        self.connection.set_retry_policy(RetryPolicy(backoffFactor=1,
+                                                     jitter=False))
+
+        with deadline(0.5):
+            self.assertRaises(socket.timeout, self.connection.get, '/rest/a')
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_expired_deadline_sends_nothing(self, mock_get_connection):
+        conn = FakeHTTPSConnection([self.json_response({})])
+        mock_get_connection.return_value = conn
+
+        with deadline(0):
+            self.assertRaises(HPOneViewTimeout, self.connection.get, '/rest/a')
+        self.assertEqual(conn.requests, [])
+
+    @mock.patch('time.time')
+    @mock.patch.object(connection, 'get_connection')
+    def test_open_breaker_fails_fast_until_probe_succeeds(
+            self, mock_get_connection, mock_time):
+        mock_time.return_value = 100.0
+        self.connection.set_retry_policy(RetryPolicy(maxAttempts=1))
+        breaker = CircuitBreaker(failureThreshold=2, resetTimeout=30)
+        self.connection.set_circuit_breaker(breaker)
+        conn = FakeHTTPSConnection([self.json_response({}, 503),
+                                    self.json_response({}, 503),
+                                    self.json_response({'minimumVersion': 1}),
+                                    self.json_response({'a': 1})])
+        mock_get_connection.return_value = conn
+
+        for i in range(2):
+            self.assertRaises(HPOneViewException, self.connection.get,
+                              '/rest/a')
+        self.assertRaises(HPOneViewCircuitOpen, self.connection.get, '/rest/a')
+        self.assertEqual(len(conn.requests), 2)
+        self.assertEqual(breaker.name, self.host)
+
+        mock_time.return_value = 131.0
+        self.assertEqual(self.connection.get('/rest/a'), {'a': 1})
+        self.assertEqual([r[1] for r in conn.requests[2:]],
+                         ['/rest/version', '/rest/a'])
+        self.assertEqual(breaker.state, 'closed')
+
+    @mock.patch.object(connection, 'do_http')
+    def test_concurrent_identical_gets_share_one_request(self, mock_do_http):
+        release = threading.Event()
+
+        def do_http(method, path, body, headers=None):
+            release.wait(5)
+            return FakeResponse(200), {'uri': path, 'members': []}
+        mock_do_http.side_effect = do_http
+        results = []
+
+        def worker():
+            results.append(self.connection.get('/rest/connection-templates/1'))
+        threads = [threading.Thread(target=worker) for i in range(4)]
+        for t in threads:
+            t.start()
+        while self.connection.get_coalesced_count() < 3:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(mock_do_http.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(len(set(id(r) for r in results)), 4)
+
+    def test_leader_mutating_its_result_does_not_reach_followers(self):
+        flights = connection.__init__.__globals__['_SingleFlight']()
+        joined = threading.Event()
+        mutated = threading.Event()
+        deepcopy = copy.deepcopy
+
+        def fetch():
+            joined.wait(5)
+            return {'members': [1, 2, 3]}
+
+        def slow_copy(value):
+            # Only the follower waits, until the leader changed its result
+            if threading.current_thread() is follower:
+                mutated.wait(5)
+            return deepcopy(value)
+        results = {}
+
+        def follow():
+            while flights.coalesced < 1:
+                time.sleep(0.001)
+            results['follower'] = flights.do('key', fetch)
+        follower = threading.Thread(target=follow)
+
+        def lead():
+            results['leader'] = flights.do('key', fetch)
+            results['leader']['members'].clear()
+            mutated.set()
+        leader = threading.Thread(target=lead)
+        with mock.patch('copy.deepcopy', side_effect=slow_copy):
+            leader.start()
+            while not flights._flights:
+                time.sleep(0.001)
+            follower.start()
+            while flights.coalesced < 1:
+                time.sleep(0.001)
+            joined.set()
+            leader.join()
+            follower.join()
+
+        self.assertEqual(results['leader'], {'members': []})
+        self.assertEqual(results['follower'], {'members': [1, 2, 3]})
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_etag_cache_revalidates_with_if_none_match(self,
+                                                       mock_get_connection):
+        body = {'uri': '/rest/enclosures/1', 'name': 'Encl1'}
+        conn = FakeHTTPSConnection([
+            self.json_response(body, headers={'ETag': '"v1"'}),
+            FakeResponse(304),
+            FakeResponse(204),
+            self.json_response(body, headers={'ETag': '"v2"'})])
+        mock_get_connection.return_value = conn
+        self.connection.set_etag_cache(maxEntries=8)
+
+        first = self.connection.get('/rest/enclosures/1')
+        first['name'] = 'modified by caller'
+        second = self.connection.get('/rest/enclosures/1')
+        self.connection.delete('/rest/enclosures/1')
+        self.connection.get('/rest/enclosures/1')
+
+        self.assertEqual(second, body)
+        self.assertNotIn('If-None-Match', conn.requests[0][3])
+        self.assertEqual(conn.requests[1][3]['If-None-Match'], '"v1"')
+        self.assertNotIn('If-None-Match', conn.requests[3][3])
+        self.assertEqual(self.connection.get_etag_cache_stats(),
+                         {'hits': 1, 'misses': 2, 'stored': 2, 'entries': 1})
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_cached_session_is_reused_and_renewed_on_401(self,
+                                                         mock_get_connection):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        cache = SessionCache(os.path.join(tmpdir, 'sessions.json'))
+        cred = {'userName': 'admin', 'password': 'secret'}
+        cache.store(self.host, cred, 'old', apiVersion=200)
+        conn = FakeHTTPSConnection([
+            self.json_response({'errorCode': 'AUTHORIZATION'}, 401),
+            self.json_response({'sessionID': 'new'}),
+            self.json_response({'members': []})])
+        mock_get_connection.return_value = conn
+        self.connection.set_session_cache(cache)
+
+        self.connection.login(cred)
+        self.assertEqual(conn.requests, [])
+        self.assertEqual(self.connection.get('/rest/alerts'), {'members': []})
+
+        self.assertEqual([(r[1], r[3].get('auth')) for r in conn.requests],
+                         [('/rest/alerts', 'old'),
+                          ('/rest/login-sessions', None),
+                          ('/rest/alerts', 'new')])
+        self.assertEqual(cache.lookup(self.host, cred, 200), ('new', True))
+
+    def test_expired_session_is_renewed_once_for_all_threads(self):
+        self.connection._cred = {'userName': 'admin', 'password': 'secret'}
+        self.connection._headers['auth'] = 'old'
+        self.connection._validateVersion = True
+        logins = []
+        barrier = threading.Barrier(3)
+
+        def send_once(method, path, body, reqHeaders):
+            if path == '/rest/login-sessions':
+                logins.append(reqHeaders.get('auth'))
+                return FakeResponse(200), b'{"sessionID": "new"}', None, True
+            if reqHeaders['auth'] == 'old':
+                barrier.wait(5)
+                return FakeResponse(401), b'{}', None, True
+            body = codec.dumps({'auth': reqHeaders['auth']})
+            return FakeResponse(200), body, None, True
+        self.connection._send_once = mock.Mock(side_effect=send_once)
+        results = []
+
+        def worker(n):
+            results.append(self.connection.put('/rest/server-profiles/%d' % n,
+                                               {})[1])
+        threads = [threading.Thread(target=worker, args=(n,))
+                   for n in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [{'auth': 'new'}] * 3)
+        self.assertEqual(logins, [None])
+
+    def test_requests_sent_during_relogin_keep_the_old_session(self):
+        self.connection._cred = {'userName': 'admin', 'password': 'secret'}
+        self.connection._headers['auth'] = 'old'
+        self.connection._validateVersion = True
+        seen = []
+        loggingIn = threading.Event()
+        secondSent = threading.Event()
+
+        def send_once(method, path, body, reqHeaders):
+            auth = reqHeaders.get('auth')
+            if path == '/rest/login-sessions':
+                loggingIn.set()
+                # Hold the login until the other thread has sent its request
+                secondSent.wait(5)
+                return FakeResponse(200), b'{"sessionID": "new"}', None, True
+            seen.append((path, auth))
+            if path == '/rest/tasks/2':
+                secondSent.set()
+            if auth != 'new':
+                return FakeResponse(401), b'{}', None, True
+            return FakeResponse(200), codec.dumps({'auth': auth}), None, True
+        self.connection._send_once = mock.Mock(side_effect=send_once)
+        results = {}
+
+        def worker(taskUri):
+            results[taskUri] = self.connection.get(taskUri)
+        first = threading.Thread(target=worker, args=('/rest/tasks/1',))
+        first.start()
+        loggingIn.wait(5)
+        second = threading.Thread(target=worker, args=('/rest/tasks/2',))
+        second.start()
+        first.join()
+        second.join()
+
+        self.assertEqual(results, {'/rest/tasks/1': {'auth': 'new'},
+                                   '/rest/tasks/2': {'auth': 'new'}})
+        self.assertEqual(sorted(seen), [('/rest/tasks/1', 'new'),
+                                        ('/rest/tasks/1', 'old'),
+                                        ('/rest/tasks/2', 'new'),
+                                        ('/rest/tasks/2', 'old')])
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_iter_members_follows_pages_lazily(self, mock_get_connection):
+        conn = FakeHTTPSConnection([
+            self.json_response({'members': [1, 2], 'nextPageUri':
+                                '/rest/alerts?filter=a&start=2&count=2'}),
+            self.json_response({'members': [3], 'nextPageUri': None})])
+        mock_get_connection.return_value = conn
+
+        members = self.connection.iter_members(
+            "/rest/alerts?filter=a&count=9999999", page_size=2)
+        self.assertEqual(next(members), 1)
+        self.assertEqual(len(conn.requests), 1)
+        self.assertEqual(list(members), [2, 3])
+
+        self.assertEqual([r[1] for r in conn.requests],
+                         ['/rest/alerts?filter=a&start=0&count=2',
+                          '/rest/alerts?filter=a&start=2&count=2'])
+        self.assertIsNone(self.connection._nextPage)
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_iter_members_adapts_page_size(self, mock_get_connection):
+        conn = FakeHTTPSConnection([
+            self.json_response({'members': [1, 2], 'nextPageUri':
+                                '/rest/tasks?start=2&count=2'}),
+            self.json_response({'members': [3, 4, 5, 6], 'nextPageUri':
+                                '/rest/tasks?start=6&count=4'}),
+            self.json_response({'members': [7], 'nextPageUri': None})])
+        mock_get_connection.return_value = conn
+        self.connection.set_page_sizer(PageSizer(initialSize=2, minSize=1))
+
+        self.assertEqual(list(self.connection.iter_members('/rest/tasks')),
+                         [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual([r[1] for r in conn.requests],
+                         ['/rest/tasks?start=0&count=2',
+                          '/rest/tasks?start=2&count=4',
+                          '/rest/tasks?start=6&count=8'])
+        stats = self.connection.get_page_size_stats()['/rest/tasks']
+        self.assertEqual((stats['pageSize'], stats['pages']), (8, 3))
+
+    @mock.patch.object(connection, 'get_connection')
+    def test_iter_members_projects_requested_fields(self, mock_get_connection):
+        server = {'name': 'bay 1', 'uri': '/rest/server-hardware/1',
+                  'status': 'OK', 'portMap': {'deviceSlots': [1, 2, 3]},
+                  'mpHostInfo': {'mpHostName': 'ilo1', 'mpIpAddresses': []}}
+        conn = FakeHTTPSConnection([
+            self.json_response({'members': [server], 'nextPageUri': None})])
+        mock_get_connection.return_value = conn
+
+        members = list(self.connection.iter_members(
+            '/rest/server-hardware', fields=['name', 'mpHostInfo.mpHostName',
+                                             'missing']))
+
+        self.assertEqual(members, [{'name': 'bay 1',
+                                    'mpHostInfo': {'mpHostName': 'ilo1'}}])
+        self.assertEqual(conn.requests[0][1],
+                         '/rest/server-hardware?fields=name,'
+                         'mpHostInfo.mpHostName,missing&start=0&count=500')
+
+    @mock.patch.object(connection, 'do_http')
+    def test_prefetch_reads_pages_concurrently_in_order(self, mock_do_http):
+        inFlight = [0, 0]
+        lock = threading.Lock()
+
+        def do_http(method, path, body, headers=None):
+            start = int(path.split('start=')[1].split('&')[0])
+            with lock:
+                inFlight[0] += 1
+                inFlight[1] = max(inFlight)
+            time.sleep(0.01 if start % 20 else 0.03)
+            with lock:
+                inFlight[0] -= 1
+            members = list(range(start, min(start + 10, 95)))
+            return FakeResponse(200), {'type': 'AlertCollection',
+                                       'members': members, 'total': 95,
+                                       'nextPageUri': 'ignored'}
+        mock_do_http.side_effect = do_http
+
+        body = self.connection.get_collection('/rest/alerts', page_size=10,
+                                              prefetch=3)
+
+        self.assertEqual(body['members'], list(range(95)))
+        self.assertEqual(body['count'], 95)
+        self.assertEqual(body['type'], 'AlertCollection')
+        self.assertIsNone(body['nextPageUri'])
+        self.assertEqual(mock_do_http.call_count, 10)
+        self.assertLessEqual(inFlight[1], 3)
+        self.assertGreater(inFlight[1], 1)
+
+    @mock.patch.object(connection, 'do_http')
+    def test_get_page_resumes_from_saved_cursor(self, mock_do_http):
+        mock_do_http.return_value = (FakeResponse(200), {
+            'members': [5, 6], 'total': 7, 'nextPageUri': None})
+        saved = self.connection.open_cursor('/rest/tasks', 5).to_json()
+
+        cursor = PageCursor.from_json(saved).seek(5)
+        members, nextCursor = self.connection.get_page(cursor)
+
+        self.assertEqual(members, [5, 6])
+        self.assertIsNone(nextCursor)
+        mock_do_http.assert_called_once_with(
+            'GET', '/rest/tasks?start=5&count=5', '', None)
+
+    @mock.patch.object(connection, 'do_http')
+    def test_get_last_page_jumps_to_last_offset(self, mock_do_http):
+        mock_do_http.side_effect = [
+            (FakeResponse(200), {'members': [0, 1], 'count': 2, 'total': 9,
+                                 'nextPageUri': '/rest/tasks?start=2&count=2'}),
+            (FakeResponse(200), {'members': [8], 'count': 1, 'total': 9,
+                                 'prevPageUri': '/rest/tasks?start=6&count=2'})]
+        self.connection.get('/rest/tasks?start=0&count=2')
+
+        self.assertEqual(self.connection.getLastPage(), [8])
+        self.assertEqual(mock_do_http.call_args[0][1],
+                         '/rest/tasks?start=8&count=2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import unittest
+
+from hpOneView.cursor import *
+
+
+class PageCursorTest(unittest.TestCase):
+
+    def test_page_uri_keeps_filters(self):
+        cursor = PageCursor.from_uri(
+            "/rest/alerts?filter=\"severity='Critical'\"&start=64&count=32")
+        self.assertEqual(cursor.uri, "/rest/alerts?filter=\"severity='Critical'\"")
+        self.assertEqual((cursor.start, cursor.count), (64, 32))
+        self.assertEqual(cursor.seek(10).page_uri,
+                         "/rest/alerts?filter=\"severity='Critical'\""
+                         "&start=10&count=32")
+        self.assertEqual(page_uri('/rest/tasks', 0, 5),
+                         '/rest/tasks?start=0&count=5')
+
+    def test_navigation(self):
+        cursor = PageCursor('/rest/tasks', 0, 10, total=35)
+        self.assertEqual(cursor.last().start, 30)
+        self.assertEqual(cursor.next().next().next().start, 30)
+        self.assertIsNone(cursor.last().next())
+        self.assertIsNone(cursor.prev())
+        self.assertRaises(ValueError, PageCursor('/rest/tasks').last)
+
+    def test_round_trips_through_json(self):
+        cursor = PageCursor('/rest/tasks?sort=name:asc', 20, 10, total=35)
+        self.assertEqual(PageCursor.from_json(cursor.to_json()), cursor)
+
+
+class PageSizerTest(unittest.TestCase):
+
+    def test_grows_fast_pages_at_most_twofold(self):
+        sizer = PageSizer(targetLatency=1.0, initialSize=100)
+        self.assertEqual(sizer.size('/rest/tasks?start=0&count=100'), 100)
+        self.assertEqual(sizer.observe('/rest/tasks', 100, 100, 0.01), 200)
+        self.assertEqual(sizer.size('/rest/tasks?filter=x'), 200)
+        self.assertEqual(sizer.size('/rest/alerts'), 100)
+
+    def test_respects_byte_budget_and_ignores_short_pages(self):
+        sizer = PageSizer(maxBytes=100000, minSize=10, initialSize=100)
+        # 2 KB per member allows 50 members per page
+        self.assertEqual(sizer.observe('/rest/server-hardware', 100, 100,
+                                       0.1, 200000), 50)
+        self.assertEqual(sizer.observe('/rest/server-hardware', 50, 3,
+                                       0.5, 6000), 50)
+        stats = sizer.get_stats()['/rest/server-hardware']
+        self.assertEqual((stats['pageSize'], stats['pages'],
+                          stats['members']), (50, 2, 103))
+        self.assertEqual(stats['memberBytes'], 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import unittest
+
+from hpOneView.activity import activity
+from hpOneView.connection import connection
+from hpOneView.deadline import *
+from hpOneView.exceptions import HPOneViewTimeout
+
+
+class DeadlineTest(unittest.TestCase):
+
+    @mock.patch('time.time')
+    def test_nested_deadline_cannot_extend_outer(self, mock_time):
+        mock_time.return_value = 100.0
+        with deadline(10) as outer:
+            with deadline(60) as inner:
+                self.assertIs(current_deadline(), inner)
+                self.assertEqual(inner.expires, outer.expires)
+                self.assertEqual(remaining_time(30), 10)
+                self.assertEqual(remaining_time(5), 5)
+            self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+        self.assertEqual(remaining_time(30), 30)
+
+    @mock.patch('time.time')
+    def test_check_raises_once_expired(self, mock_time):
+        mock_time.return_value = 100.0
+        with deadline(10):
+            check_deadline()
+            mock_time.return_value = 110.0
+            self.assertRaises(HPOneViewTimeout, check_deadline)
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_wait4task_stops_at_deadline(self, mock_time, mock_sleep):
+        clock = [100.0]
+        mock_time.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+        mock_sleep.side_effect = sleep
+        con = connection('1.2.3.4')
+        con.get = mock.Mock(return_value={'uri': '/rest/tasks/1',
+                                          'taskState': 'Running'})
+        act = activity(con)
+
+        with deadline(2.5):
+            self.assertRaises(HPOneViewTimeout, act.wait4task,
+                              {'uri': '/rest/tasks/1'}, tout=600)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list],
+                         [1, 1.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
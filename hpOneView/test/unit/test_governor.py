@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import threading
+import time
+import unittest
+
+from hpOneView.governor import *
+
+
+class RequestGovernorTest(unittest.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_token_bucket_spaces_requests(self, mock_time, mock_sleep):
+        mock_time.return_value = 100.0
+        bucket = TokenBucket(rate=2, burst=2)
+        waits = [bucket.reserve() for i in range(4)]
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+
+    @mock.patch('time.time')
+    def test_token_bucket_paces_bytes(self, mock_time):
+        mock_time.return_value = 100.0
+        bucket = TokenBucket(rate=1000, burst=1000)
+        waits = [bucket.reserve(500) for i in range(4)]
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+
+    def test_concurrency_is_capped_per_lane(self):
+        governor = RequestGovernor(writeConcurrency=2)
+        release = threading.Event()
+        entered = []
+
+        def worker():
+            with governor.slot('POST'):
+                entered.append(1)
+                release.wait()
+
+        threads = [threading.Thread(target=worker) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.assertEqual(len(entered), 2)
+        # Reads are governed separately and are not held up by writes
+        with governor.slot('GET'):
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        stats = governor.get_stats()
+        self.assertEqual(stats['write']['requests'], 4)
+        self.assertEqual(stats['write']['peakInFlight'], 2)
+        self.assertEqual(stats['write']['inFlight'], 0)
+        self.assertTrue(stats['write']['maxWait'] > 0)
+        self.assertEqual(stats['read']['requests'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -200,5 +200,15 @@ class NetworkingTest(unittest.TestCase):
 		li_firmware_uri = uri['li'] + '/{id}/firmware'
 		mock_get.assert_called_once_with(li_firmware_uri.format(id=id))
 
+	@mock.patch.object(connection, 'iter_members')
+	def test_iter_enet_networks(self, mock_iter_members):
+		self.networking.iter_enet_networks(page_size=100)
+		mock_iter_members.assert_called_once_with(uri['enet'], 100, fields=None)
+
+	@mock.patch.object(connection, 'iter_members')
+	def test_iter_lis_keeps_filter(self, mock_iter_members):
+		self.networking.iter_lis(filter="?filter=name='LI1'")
+		mock_iter_members.assert_called_once_with(uri['li'] + "?filter=name='LI1'", None)
+
 if __name__ == '__main__':
 	unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import unittest
+
+from hpOneView.common import uri
+from hpOneView.connection import connection
+from hpOneView.query import *
+from hpOneView.servers import servers
+
+
+class QueryTest(unittest.TestCase):
+
+    def test_values_are_quoted_and_encoded(self):
+        q = Query(eq('name', "O'Neil & Co"), eq('position', 3),
+                  eq('enabled', True))
+        self.assertEqual(q.to_query_string(),
+                         "filter=%22name='O''Neil%20%26%20Co'%22"
+                         "&filter=%22position=3%22"
+                         "&filter=%22enabled=true%22")
+
+    def test_top_level_and_becomes_separate_filters(self):
+        q = Query(between('created', '2016-01-01', '2016-02-01') &
+                  in_('status', ['OK', 'Warning']))
+        self.assertEqual(q.params(), [
+            ('filter', "%22created%3E='2016-01-01'%22"),
+            ('filter', "%22created%3C='2016-02-01'%22"),
+            ('filter', "%22(status='OK'%20OR%20status='Warning')%22")])
+
+    def test_query_syntax_sort_and_range(self):
+        q = Query(ne('state', 'Monitored'), syntax='query')
+        q.sort('name', 'desc').start(10).count(5)
+        self.assertEqual(q.uri('/rest/enclosures?view=expand'),
+                         "/rest/enclosures?view=expand"
+                         "&query=%22state%20NE%20'Monitored'%22"
+                         "&sort=name:desc&start=10&count=5")
+        self.assertEqual(Query().uri('/rest/enclosures'), '/rest/enclosures')
+
+    @mock.patch.object(connection, 'get')
+    def test_server_lookup_is_a_single_filtered_get(self, mock_get):
+        mock_get.return_value = {'members': [{'name': 'bay 1'}]}
+        srv = servers(connection('1.2.3.4'))
+
+        self.assertEqual(srv.get_server_by_name('bay 1'), {'name': 'bay 1'})
+        mock_get.assert_called_once_with(
+            uri['servers'] + "?filter=%22name='bay%201'%22&start=0&count=-1")
+
+    @mock.patch.object(connection, 'get')
+    def test_projection_keeps_first_page_semantics(self, mock_get):
+        mock_get.return_value = {'members': [
+            {'name': 'bay 1', 'uri': '/rest/server-hardware/1',
+             'portMap': {}}], 'nextPageUri': '/rest/server-hardware?start=1'}
+        srv = servers(connection('1.2.3.4'))
+
+        self.assertEqual(srv.get_servers(['name', 'uri']),
+                         [{'name': 'bay 1', 'uri': '/rest/server-hardware/1'}])
+        mock_get.assert_called_once_with(uri['servers'] + '?fields=name,uri')
+
+
+if __name__ == '__main__':
+    unittest.main()
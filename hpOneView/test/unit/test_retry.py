@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import errno
+import mock
+import socket
+import ssl
+import unittest
+
+from hpOneView.retry import *
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_backoff_is_exponential_and_capped(self):
+        policy = RetryPolicy(backoffFactor=1, maxBackoff=5, jitter=False)
+        self.assertEqual([policy.backoff(n) for n in range(1, 6)],
+                         [1, 2, 4, 5, 5])
+
+    def test_full_jitter_stays_below_backoff(self):
+        policy = RetryPolicy(backoffFactor=1, maxBackoff=30)
+        for attempt in range(1, 8):
+            self.assertTrue(0 <= policy.backoff(attempt) <= 2 ** (attempt - 1))
+
+    def test_post_only_retried_when_request_was_rejected(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.retry_on_status('POST', 503))
+        self.assertTrue(policy.retry_on_status('POST', 429))
+        self.assertFalse(policy.retry_on_status('POST', 502))
+        self.assertTrue(policy.retry_on_status('GET', 502))
+        self.assertFalse(policy.retry_on_status('GET', 500))
+
+    def test_errors_before_sending_are_always_retryable(self):
+        policy = RetryPolicy()
+        refused = socket.error(errno.ECONNREFUSED, 'Connection refused')
+        reset = socket.error(errno.ECONNRESET, 'Connection reset')
+        self.assertTrue(policy.retry_on_error('POST', refused, sent=False))
+        self.assertFalse(policy.retry_on_error('POST', reset, sent=True))
+        self.assertTrue(policy.retry_on_error('DELETE', reset, sent=True))
+        self.assertFalse(policy.retry_on_error('GET', ssl.SSLError(), False))
+        self.assertFalse(policy.retry_on_error('GET', ValueError(), False))
+
+    def test_retry_after_is_honoured_and_bounded(self):
+        policy = RetryPolicy(backoffFactor=0, maxRetryAfter=60)
+        resp = mock.Mock()
+        resp.getheader.return_value = '30'
+        self.assertEqual(policy.delay(1, resp), 30)
+        resp.getheader.return_value = '3600'
+        self.assertEqual(policy.delay(1, resp), 60)
+        resp.getheader.return_value = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        self.assertEqual(policy.delay(1, resp), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
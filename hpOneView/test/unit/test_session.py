@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+import mock
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from hpOneView.exceptions import HPOneViewException
+from hpOneView.session import *
+
+
+class SessionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        super(SessionCacheTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'cache', 'sessions.json')
+        self.cache = SessionCache(self.path, sessionTTL=60, versionTTL=600)
+        self.cred = {'userName': 'admin', 'password': 'secret'}
+
+    @mock.patch('time.time')
+    def test_sessions_expire_after_ttl(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.cache.store('oneview1', self.cred, 'abc', apiVersion=200)
+
+        self.assertEqual(self.cache.lookup('oneview1', self.cred, 200),
+                         ('abc', True))
+        self.assertEqual(self.cache.lookup('oneview1', self.cred, 300),
+                         ('abc', False))
+        self.assertEqual(self.cache.lookup('oneview2', self.cred, 200),
+                         (None, False))
+        mock_time.return_value = 1100.0
+        self.assertEqual(self.cache.lookup('oneview1', self.cred, 200),
+                         (None, True))
+
+    def test_file_is_private_and_holds_no_password(self):
+        self.cache.store('oneview1', self.cred, 'abc')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        with open(self.path) as fin:
+            self.assertNotIn('secret', fin.read())
+        self.cache.forget('oneview1', self.cred)
+        self.assertEqual(self.cache.lookup('oneview1', self.cred, 200)[0],
+                         None)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'POSIX permissions')
+    def test_readable_file_is_rejected(self):
+        self.cache.store('oneview1', self.cred, 'abc')
+        os.chmod(self.path, 0o644)
+        self.assertRaises(HPOneViewException, self.cache.lookup,
+                          'oneview1', self.cred, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
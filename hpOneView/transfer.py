@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+transfer.py
+~~~~~~~~~~~~
+
+This module implements the helpers used to stream large uploads and
+downloads to and from the appliance
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+__title__ = 'transfer'
+__version__ = '0.0.1'
+__copyright__ = '(C) Copyright (2012-2016) Hewlett Packard Enterprise ' \
+                ' Development LP'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+###
+# (C) Copyright (2012-2016) Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+###
+
+import hashlib
+import mmap
+import os
+import time
+
+from hpOneView.exceptions import HPOneViewTransferError
+
+MULTIPART_BOUNDARY = '----------ThIs_Is_tHe_bouNdaRY_$'
+
+
+def file_checksum(path, chunkSize=1048576):
+    """ Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fin:
+        while True:
+            data = fin.read(chunkSize)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class TransferProgress(object):
+    """ Progress of an upload or a download.
+
+    Progress callbacks receive this object after every chunk; it reports
+    the bytes moved so far, the average rate in bytes per second and, when
+    the size is known, the estimated seconds remaining.
+    """
+
+    def __init__(self, total=None, callback=None):
+        self.total = total
+        self.transferred = 0
+        self.started = time.time()
+        self.finished = None
+        self._callback = callback
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.time()
+        return end - self.started
+
+    @property
+    def rate(self):
+        """ Average bytes per second since the transfer started."""
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.transferred / elapsed
+
+    @property
+    def eta(self):
+        """ Estimated seconds remaining, or None if it cannot be known."""
+        if self.total is None or not self.rate:
+            return None
+        return max(self.total - self.transferred, 0) / self.rate
+
+    def restart(self):
+        self.transferred = 0
+        self.started = time.time()
+        self.finished = None
+
+    def update(self, count):
+        self.transferred += count
+        if self._callback is not None:
+            self._callback(self)
+
+    def finish(self):
+        self.finished = time.time()
+        if self._callback is not None:
+            self._callback(self)
+
+    def as_dict(self):
+        return {'transferred': self.transferred, 'total': self.total,
+                'elapsed': self.elapsed, 'rate': self.rate, 'eta': self.eta}
+
+
+class MultipartFileEncoder(object):
+    """ multipart/form-data body carrying one file, streamed from disk.
+
+    The body is produced as a preamble, the file itself and an epilogue, so
+    its Content-Length is known up front and no encoded copy of the file is
+    ever written to disk. The file is memory mapped and sent as memoryview
+    slices, without copying each chunk.
+
+    Unless ``checksum`` is False, the file is hashed as iter_chunks sends
+    it, so verify can later tell whether it changed without reading it an
+    extra time up front.
+
+    Args:
+        path:
+            Path of the file to upload.
+        baseName:
+            File name reported to the appliance.
+        boundary:
+            Multipart boundary string.
+        checksum:
+            Hash the file while it is sent.
+    """
+
+    def __init__(self, path, baseName, boundary=MULTIPART_BOUNDARY,
+                 checksum=True):
+        CRLF = '\r\n'
+        self.path = path
+        self.baseName = baseName
+        self.content_type = 'multipart/form-data; boundary=%s' % boundary
+        self.preamble = ('--' + boundary + CRLF +
+                         'Content-Disposition: form-data'
+                         '; name="file"; filename="' + baseName + '"' + CRLF +
+                         'Content-Type: application/octet-stream' + CRLF +
+                         CRLF).encode('utf-8')
+        self.epilogue = (CRLF + '--' + boundary + '--' + CRLF +
+                         CRLF).encode('utf-8')
+        self.fileSize = os.path.getsize(path)
+        self.checksum = None
+        self._hashing = checksum
+        self.content_length = (len(self.preamble) + self.fileSize +
+                               len(self.epilogue))
+
+    def verify(self):
+        """ Raise HPOneViewTransferError if the file changed since it was
+        first sent in full. Before that only its size is checked."""
+        if os.path.getsize(self.path) != self.fileSize or (
+                self.checksum is not None and
+                file_checksum(self.path) != self.checksum):
+            raise HPOneViewTransferError(
+                self.path + ' changed while it was being uploaded')
+
+    def iter_chunks(self, chunkSize=1048576):
+        """ Yield the body as bytes and memoryview chunks.
+
+        Each chunk must be consumed (sent) before asking for the next one,
+        as the views are only valid while the file stays mapped.
+        """
+        yield self.preamble
+        digest = None
+        if self._hashing and self.checksum is None:
+            digest = hashlib.sha256()
+        for chunk in self._iter_file(chunkSize):
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+        if digest is not None:
+            self.checksum = digest.hexdigest()
+        yield self.epilogue
+
+    def _iter_file(self, chunkSize):
+        if not self.fileSize:
+            return
+        with open(self.path, 'rb') as fin:
+            mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                view = memoryview(mapped)
+            except TypeError:
+                # Python 2 mmap objects only offer the old buffer API
+                view = None
+            try:
+                for offset in range(0, self.fileSize, chunkSize):
+                    if view is None:
+                        yield mapped[offset:offset + chunkSize]
+                        continue
+                    chunk = view[offset:offset + chunkSize]
+                    try:
+                        yield chunk
+                    finally:
+                        chunk.release()
+            finally:
+                if view is not None:
+                    view.release()
+                mapped.close()
+
+# vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
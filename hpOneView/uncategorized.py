@@ -58,4 +58,7 @@ class uncategorized(object):
         body = self._con.get(uri['unmanaged-devices'])
         return body
 
+    def iter_unmanaged_devices(self, page_size=None):
+        return self._con.iter_members(uri['unmanaged-devices'], page_size)
+
 # vim:set shiftwidth=4 tabstop=4 expandtab textwidth=79:
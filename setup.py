@@ -30,4 +30,6 @@ setup(name='hpOneView',
       author='Hewlett Packard Enterprise Development LP',
       license='MIT',
       packages=['hpOneView'],
-      install_requires=['future>=0.15.2'])
+      install_requires=['future>=0.15.2'],
+      extras_require={'fastjson': ['orjson; python_version >= "3.6"',
+                                   'ujson; python_version < "3.6"']})